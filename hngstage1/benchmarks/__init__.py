@@ -0,0 +1,18 @@
+"""
+Benchmarks for the String Analysis API.
+
+Run each module from the project directory, e.g.::
+
+    python -m benchmarks.analysis
+"""
+
+import os
+
+
+def setup_django():
+    """Configure Django so benchmarks can import the strings app."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hngstage1.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+
+    import django
+    django.setup()
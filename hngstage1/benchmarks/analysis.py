@@ -0,0 +1,50 @@
+"""
+Micro-benchmark for AnalyzedString.compute_properties.
+
+Compares the current single-pass analysis with the original multi-pass
+implementation across input sizes:
+
+    python -m benchmarks.analysis [--sizes 1000 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import random
+import string
+import timeit
+
+from benchmarks import setup_django
+from benchmarks.reference import reference_compute_properties
+
+
+ALPHABET = string.ascii_letters + string.digits + '     \n' + 'éßΣ😀'
+
+
+def make_value(size, seed=0):
+    rng = random.Random(seed)
+    return ''.join(rng.choice(ALPHABET) for _ in range(size))
+
+
+def best_time(func, value, repeat):
+    return min(timeit.repeat(lambda: func(value), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from strings.models import AnalyzedString
+
+    print(f"{'size':>12} {'reference (s)':>15} {'current (s)':>13} {'speedup':>9}")
+    for size in args.sizes:
+        value = make_value(size)
+        assert AnalyzedString.compute_properties(value) == reference_compute_properties(value)
+        reference = best_time(reference_compute_properties, value, args.repeat)
+        current = best_time(AnalyzedString.compute_properties, value, args.repeat)
+        print(f"{size:>12} {reference:>15.6f} {current:>13.6f} {reference / current:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
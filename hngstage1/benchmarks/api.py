@@ -0,0 +1,292 @@
+"""
+End-to-end throughput and latency of the strings API.
+
+Migrates a fresh SQLite database in a temporary directory, seeds it with
+--strings strings whose lengths follow --lengths, then runs each scenario -
+POST /strings, GET /strings/{value}, filtered list pages and natural-language
+queries - reporting requests/s and p50/p99 latency:
+
+    python -m benchmarks.api [--strings 10000] [--lengths lognormal:40] [--requests 500]
+                             [--server] [--cache] [--json results.json] [--compare baseline.json]
+
+Length distributions are ``fixed:N``, ``uniform:MIN-MAX`` and
+``lognormal:MEDIAN`` (sigma 1, at least one character). Requests go through
+Django's test client in-process, or with --server over HTTP to a locally
+spawned ``runserver``. The response cache is disabled unless --cache is given.
+--json writes the results with the commit they were measured at, and
+--compare prints the change against an earlier results file.
+"""
+
+import argparse
+from datetime import datetime, timezone
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlencode
+
+from benchmarks import setup_django
+from benchmarks.analysis import make_value
+from benchmarks.concurrency import percentile
+from benchmarks.reference import load_query_corpus
+
+
+LIST_QUERIES = [
+    {'min_length': 10},
+    {'is_palindrome': 'false', 'max_length': 100},
+    {'word_count': 2},
+    {'contains_character': 'q'},
+    {'min_length': 20, 'contains_character': 'a'},
+]
+
+
+def length_sampler(spec):
+    """Return a function drawing string lengths from ``spec``, e.g. ``uniform:5-200``."""
+    kind, _, arg = spec.partition(':')
+    try:
+        if kind == 'fixed':
+            size = int(arg)
+            return lambda rng: size
+        if kind == 'uniform':
+            low, high = map(int, arg.split('-'))
+            return lambda rng: rng.randint(low, high)
+        if kind == 'lognormal':
+            mu = math.log(float(arg))
+            return lambda rng: max(1, round(rng.lognormvariate(mu, 1.0)))
+    except ValueError:
+        pass
+    raise ValueError(f"invalid length distribution {spec!r}")
+
+
+def seed_strings(count, lengths, seed):
+    from strings.ingest import bulk_create_strings
+    from strings.models import AnalyzedString
+
+    rng = random.Random(seed)
+    values = []
+    for start in range(0, count, 10_000):
+        batch = [
+            f"{i} {make_value(lengths(rng), seed=seed + i)}"
+            for i in range(start, min(start + 10_000, count))
+        ]
+        bulk_create_strings([AnalyzedString.from_value(value) for value in batch])
+        values.extend(batch)
+    return values
+
+
+def build_scenarios(values, corpus, requests, lengths, seed):
+    """Return {scenario: [(method, path, body), ...]} with ``requests`` requests each."""
+    rng = random.Random(seed)
+    # The value route cannot match a newline; those strings are read by ID instead
+    addressable = [value for value in values if '\n' not in value]
+    return {
+        'create': [
+            ('POST', '/strings', json.dumps({'value': f"new {i} {make_value(lengths(rng), seed=seed - i - 1)}"}))
+            for i in range(requests)
+        ],
+        'detail': [
+            ('GET', '/strings/' + quote(rng.choice(addressable), safe=''), None)
+            for _ in range(requests)
+        ],
+        'list': [
+            ('GET', '/strings?' + urlencode({**LIST_QUERIES[i % len(LIST_QUERIES)], 'limit': 20}), None)
+            for i in range(requests)
+        ],
+        'natural_language': [
+            ('GET', '/strings/filter-by-natural-language?' + urlencode({'query': corpus[i % len(corpus)], 'limit': 20}), None)
+            for i in range(requests)
+        ],
+    }
+
+
+class InProcessClient:
+    """Sends requests through Django's test client."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def request(self, method, path, body):
+        if method == 'POST':
+            return self.client.post(path, body, content_type='application/json').status_code
+        return self.client.generic(method, path).status_code
+
+
+class HTTPClient:
+    """
+    Sends each request over a new HTTP connection. runserver writes headers
+    and body separately, so on a kept-alive connection Nagle's algorithm and
+    delayed ACKs add ~40 ms to every request after the first.
+    """
+
+    def __init__(self, port):
+        self.port = port
+
+    def request(self, method, path, body):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(port, timeout=30):
+    server = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('runserver did not start')
+
+
+def run_scenario(client, requests, warmup):
+    for method, path, body in requests[:warmup]:
+        client.request(method, path, body)
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for method, path, body in requests[warmup:]:
+        request_started = time.perf_counter()
+        status = client.request(method, path, body)
+        latencies.append(time.perf_counter() - request_started)
+        errors += status >= 400
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'mean_ms': 1000 * sum(latencies) / len(latencies),
+        'p50_ms': 1000 * percentile(latencies, 0.5),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    header = f"{'scenario':>16} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    print(header + (f" {'req/s vs base':>14} {'p99 vs base':>12}" if baseline else ''))
+    for scenario, result in results.items():
+        line = (
+            f"{scenario:>16} {result['requests_per_second']:>9.1f} {result['p50_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['errors']:>7}"
+        )
+        base = (baseline or {}).get(scenario)
+        if base:
+            line += (
+                f" {result['requests_per_second'] / base['requests_per_second'] - 1:>+13.1%}"
+                f" {result['p99_ms'] / base['p99_ms'] - 1:>+11.1%}"
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--strings', type=int, default=10_000, help='strings seeded before measuring')
+    parser.add_argument('--lengths', default='lognormal:40',
+                        help='string length distribution (default: lognormal:40)')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per scenario')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--server', action='store_true', help='send requests to a spawned runserver over HTTP')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--json', metavar='PATH', help='write the results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='compare with results written by --json')
+    args = parser.parse_args()
+    try:
+        lengths = length_sampler(args.lengths)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The spawned server inherits the same database and cache settings
+        os.environ['SQLITE_PATH'] = os.path.join(directory, 'bench.sqlite3')
+        if not args.cache:
+            os.environ['STRINGS_CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+        setup_django()
+        from django.core.management import call_command
+        from django.db import connection
+
+        if connection.vendor != 'sqlite':
+            parser.error('the benchmark seeds a temporary SQLite database; unset DB_ENGINE')
+        call_command('migrate', verbosity=0)
+        values = seed_strings(args.strings, lengths, args.seed)
+        scenarios = build_scenarios(
+            values, load_query_corpus(), args.warmup + args.requests, lengths, args.seed
+        )
+        connection.close()
+
+        server = None
+        if args.server:
+            port = free_port()
+            server = spawn_server(port)
+            client = HTTPClient(port)
+        else:
+            client = InProcessClient()
+        try:
+            results = {name: run_scenario(client, requests, args.warmup) for name, requests in scenarios.items()}
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'mode': 'server' if args.server else 'in-process',
+        'strings': args.strings,
+        'lengths': args.lengths,
+        'cache': args.cache,
+        'results': results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print(f"{report['mode']}, {args.strings} strings, {args.requests} requests per scenario, "
+          f"cache {'on' if args.cache else 'off'}")
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
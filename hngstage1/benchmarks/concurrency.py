@@ -0,0 +1,132 @@
+"""
+Sync (WSGI) vs async (ASGI) views under many concurrent clients.
+
+Seeds a throwaway test database, then drives the same request mix (detail,
+list page and natural-language filter) through Django's WSGI handler from a
+pool of client threads, and through its ASGI handler from concurrent
+coroutines, reporting throughput and latency percentiles:
+
+    python -m benchmarks.concurrency [--clients 1 16 64] [--requests 50] [--cache]
+
+Both run in-process, so the numbers compare request-handling overhead and
+concurrency, not network or server behaviour. The response cache is disabled
+unless --cache is given.
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from benchmarks import setup_django
+from benchmarks.analysis import make_value
+
+
+def request_mix(string_ids, count, offset):
+    urls = []
+    for i in range(count):
+        kind = (i + offset) % 3
+        if kind == 0:
+            # By ID: AsyncClient mangles non-ASCII paths, which real ASGI servers do not
+            urls.append(f'/strings/by-id/{string_ids[(i * 7 + offset) % len(string_ids)]}')
+        elif kind == 1:
+            urls.append('/strings?limit=20&min_length=10')
+        else:
+            urls.append('/strings/filter-by-natural-language?query=strings%20longer%20than%2020%20characters&limit=20')
+    return urls
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_sync(clients, urls_per_client):
+    from django.test import Client
+
+    def worker(urls):
+        client = Client()
+        latencies = []
+        for url in urls:
+            started = time.perf_counter()
+            assert client.get(url).status_code == 200
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        return [t for result in pool.map(worker, urls_per_client) for t in result]
+
+
+def run_async(urls_per_client):
+    from django.test import AsyncClient
+
+    async def worker(urls):
+        client = AsyncClient()
+        latencies = []
+        for url in urls:
+            started = time.perf_counter()
+            assert (await client.get(url)).status_code == 200
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def main():
+        results = await asyncio.gather(*(worker(urls) for urls in urls_per_client))
+        return [t for result in results for t in result]
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--requests', type=int, default=50, help='requests per client')
+    parser.add_argument('--strings', type=int, default=5_000, help='strings in the database')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import override_settings
+    from django.urls import include, path
+    from strings.ingest import bulk_create_strings
+    from strings.models import AnalyzedString
+
+    # ROOT_URLCONF may be any object with urlpatterns, not only a module path
+    urlconfs = {
+        mode: type(f'{mode}_urls', (), {'urlpatterns': [path('strings', include(module))]})
+        for mode, module in [('sync', 'strings.urls'), ('async', 'strings.async_urls')]
+    }
+    caches = settings.CACHES
+    if not args.cache:
+        caches = {**caches, 'strings': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        strings = [AnalyzedString.from_value(make_value(10 + i % 40, seed=i)) for i in range(args.strings)]
+        bulk_create_strings(strings)
+        string_ids = [obj.id for obj in strings]
+
+        print(f"{args.strings} strings, {args.requests} requests per client, cache {'on' if args.cache else 'off'}")
+        print(f"{'mode':>6} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for clients in args.clients:
+            urls_per_client = [request_mix(string_ids, args.requests, offset) for offset in range(clients)]
+            for mode in ['sync', 'async']:
+                with override_settings(ROOT_URLCONF=urlconfs[mode], CACHES=caches):
+                    started = time.perf_counter()
+                    if mode == 'sync':
+                        latencies = run_sync(clients, urls_per_client)
+                    else:
+                        latencies = run_async(urls_per_client)
+                    elapsed = time.perf_counter() - started
+                print(
+                    f"{mode:>6} {clients:>8} {len(latencies) / elapsed:>9.1f} "
+                    f"{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f}"
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
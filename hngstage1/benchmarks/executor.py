@@ -0,0 +1,51 @@
+"""
+Throughput of the analysis backends on a batch of strings.
+
+Runs analyze_many over the same batch with the inline, thread and process
+backends and reports strings and megabytes analyzed per second:
+
+    python -m benchmarks.executor [--count 200] [--size 100000] [--workers 0]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks import setup_django
+from benchmarks.analysis import make_value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=200, help='strings per batch')
+    parser.add_argument('--size', type=int, default=100_000, help='characters per string')
+    parser.add_argument('--workers', type=int, default=0, help='pool size (0 = one per CPU)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from strings import executor
+
+    values = [make_value(args.size, seed=i) for i in range(args.count)]
+    megabytes = sum(len(value.encode('utf-8')) for value in values) / 1e6
+    print(f"{args.count} strings x {args.size} chars on {os.cpu_count()} CPUs")
+    print(f"{'backend':>8} {'seconds':>9} {'strings/s':>10} {'MB/s':>8}")
+
+    for backend in ['inline', 'thread', 'process']:
+        with override_settings(
+            STRINGS_ANALYSIS_BACKEND=backend,
+            STRINGS_ANALYSIS_MAX_WORKERS=args.workers,
+            STRINGS_ANALYSIS_OFFLOAD_THRESHOLD=0,
+        ):
+            executor.analyze_many(values[:1])  # start the pool outside the timing
+            best = float('inf')
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                executor.analyze_many(values)
+                best = min(best, time.perf_counter() - started)
+        print(f"{backend:>8} {best:>9.3f} {args.count / best:>10.1f} {megabytes / best:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Parse latency of the natural-language query parser.
+
+Times the original regex-per-pattern parser against the compiled parser, both
+uncached and memoized, over the phrasings in benchmarks/nl_queries.txt:
+
+    python -m benchmarks.nl_parser [--rounds 50]
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django
+from benchmarks.reference import load_query_corpus, reference_parse_natural_language_query
+
+
+def time_per_query(parse, corpus, rounds, before_round=None):
+    elapsed = 0.0
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        started = time.perf_counter()
+        for query in corpus:
+            parse(query)
+        elapsed += time.perf_counter() - started
+    return elapsed / (rounds * len(corpus))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from strings import nlquery
+
+    corpus = load_query_corpus()
+    results = [
+        ('reference', time_per_query(reference_parse_natural_language_query, corpus, args.rounds)),
+        ('compiled', time_per_query(nlquery.parse_query, corpus, args.rounds, nlquery.cache_clear)),
+    ]
+    nlquery.cache_clear()
+    results.append(('memoized', time_per_query(nlquery.parse_query, corpus, args.rounds)))
+
+    print(f"{len(corpus)} queries x {args.rounds} rounds")
+    print(f"{'parser':>10} {'us/query':>9} {'speedup':>8}")
+    for name, seconds in results:
+        print(f"{name:>10} {seconds * 1e6:>9.2f} {results[0][1] / seconds:>7.2f}x")
+    print(nlquery.cache_info())
+
+
+if __name__ == '__main__':
+    main()
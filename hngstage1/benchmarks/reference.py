@@ -0,0 +1,81 @@
+"""
+Reference implementations the benchmarks and tests compare against.
+
+These are the original multi-pass analysis and regex-per-pattern query
+parser, kept verbatim as equivalence oracles, plus the natural-language
+query corpus loader.
+"""
+
+import hashlib
+from pathlib import Path
+import re
+
+
+QUERY_CORPUS = Path(__file__).resolve().parent / 'nl_queries.txt'
+
+
+def reference_compute_properties(value):
+    """The original multi-pass analysis, kept as the equivalence oracle."""
+    sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    normalized = value.lower()
+    character_frequency_map = {}
+    for char in value:
+        character_frequency_map[char] = character_frequency_map.get(char, 0) + 1
+    return {
+        'id': sha256_hash,
+        'length': len(value),
+        'is_palindrome': normalized == normalized[::-1],
+        'unique_characters': len(set(value)),
+        'word_count': len(value.split()),
+        'sha256_hash': sha256_hash,
+        'character_frequency_map': character_frequency_map
+    }
+
+
+def reference_parse_natural_language_query(query):
+    """The original regex-per-pattern parser, kept as the regression oracle."""
+    query_lower = query.lower().strip()
+    filters = {}
+    if 'palindrome' in query_lower or 'palindromic' in query_lower:
+        filters['is_palindrome'] = True
+    if 'single word' in query_lower or 'one word' in query_lower:
+        filters['word_count'] = 1
+    elif 'two word' in query_lower or '2 word' in query_lower:
+        filters['word_count'] = 2
+    elif 'three word' in query_lower or '3 word' in query_lower:
+        filters['word_count'] = 3
+    else:
+        word_count_match = re.search(r'(\d+)\s*words?', query_lower)
+        if word_count_match:
+            filters['word_count'] = int(word_count_match.group(1))
+    longer_match = re.search(r'(?:longer|more)\s+than\s+(\d+)\s*(?:character|char)', query_lower)
+    if longer_match:
+        filters['min_length'] = int(longer_match.group(1)) + 1
+    shorter_match = re.search(r'(?:shorter|less)\s+than\s+(\d+)\s*(?:character|char)', query_lower)
+    if shorter_match:
+        filters['max_length'] = int(shorter_match.group(1)) - 1
+    at_least_match = re.search(r'at\s+least\s+(\d+)\s*(?:character|char)', query_lower)
+    if at_least_match:
+        filters['min_length'] = int(at_least_match.group(1))
+    at_most_match = re.search(r'at\s+most\s+(\d+)\s*(?:character|char)', query_lower)
+    if at_most_match:
+        filters['max_length'] = int(at_most_match.group(1))
+    letter_match = re.search(r'(?:containing|with|contain)\s+(?:the\s+)?(?:letter|character)\s+([a-z])', query_lower)
+    if letter_match:
+        filters['contains_character'] = letter_match.group(1)
+    if 'first vowel' in query_lower:
+        filters['contains_character'] = 'a'
+    elif 'second vowel' in query_lower:
+        filters['contains_character'] = 'e'
+    elif 'third vowel' in query_lower:
+        filters['contains_character'] = 'i'
+    elif 'fourth vowel' in query_lower:
+        filters['contains_character'] = 'o'
+    elif 'fifth vowel' in query_lower:
+        filters['contains_character'] = 'u'
+    return filters
+
+
+def load_query_corpus():
+    lines = QUERY_CORPUS.read_text(encoding='utf-8').splitlines()
+    return [line for line in lines if line.strip() and not line.startswith('#')]
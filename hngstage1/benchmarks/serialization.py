@@ -0,0 +1,71 @@
+"""
+List serialization: DRF's ModelSerializer path against the lean values() path.
+
+Seeds a throwaway test database, then times fetching, serializing and
+rendering the newest N rows both ways, checking that the bytes are identical:
+
+    python -m benchmarks.serialization [--rows 1000 10000 100000] [--size 40]
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django
+from benchmarks.analysis import make_value
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--size', type=int, default=40, help='characters per string')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from rest_framework.renderers import JSONRenderer
+    from strings import renderers
+    from strings.ingest import bulk_create_strings
+    from strings.models import AnalyzedString
+    from strings.pagination import KEYSET_ORDERING
+    from strings.serializers import AnalyzedStringSerializer, serialize_queryset
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        total = max(args.rows)
+        for start in range(0, total, 10_000):
+            bulk_create_strings([
+                AnalyzedString.from_value(f"{i} {make_value(args.size, seed=i)}")
+                for i in range(start, min(start + 10_000, total))
+            ])
+        queryset = AnalyzedString.objects.order_by(*KEYSET_ORDERING)
+
+        print(f"orjson {'available' if renderers.orjson else 'not installed'}")
+        print(f"{'rows':>8} {'drf s':>8} {'lean s':>8} {'speedup':>8}")
+        for rows in args.rows:
+            drf, expected = best_time(
+                lambda: JSONRenderer().render(AnalyzedStringSerializer(queryset[:rows], many=True).data),
+                args.repeat,
+            )
+            lean, actual = best_time(
+                lambda: renderers.FastJSONRenderer().render(serialize_queryset(queryset[:rows])),
+                args.repeat,
+            )
+            assert actual == expected, 'lean serialization changed the payload'
+            print(f"{rows:>8} {drf:>8.3f} {lean:>8.3f} {drf / lean:>7.1f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
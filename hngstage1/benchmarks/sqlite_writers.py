@@ -0,0 +1,101 @@
+"""
+Concurrent writers against a file-backed SQLite database, per SQLITE_PROFILE.
+
+For each profile, migrates a fresh database in a temporary directory and runs
+several writer processes that each create strings through the model (the same
+transaction a POST /strings runs), reporting throughput and the share of
+writes that failed with "database is locked":
+
+    python -m benchmarks.sqlite_writers [--writers 8] [--writes 200] [--profiles default tuned]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import setup_django
+from benchmarks.analysis import make_value
+
+
+def write_strings(writer, writes, size):
+    from django.db import OperationalError, connections
+    from strings.models import AnalyzedString
+
+    connections.close_all()  # never share the parent's connection after fork
+    created = locked = 0
+    for i in range(writes):
+        try:
+            AnalyzedString.objects.create(value=f"{writer}-{i} {make_value(size, seed=i)}")
+            created += 1
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked += 1
+    connections.close_all()
+    return created, locked
+
+
+def run_profile(args):
+    """Child process: migrate the database named by SQLITE_PATH and write to it."""
+    setup_django()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    context = multiprocessing.get_context('fork')
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.writers, mp_context=context) as pool:
+        results = list(pool.map(
+            write_strings, range(args.writers), [args.writes] * args.writers, [args.size] * args.writers
+        ))
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'created': sum(created for created, _ in results),
+        'locked': sum(locked for _, locked in results),
+        'seconds': elapsed,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8, help='concurrent writer processes')
+    parser.add_argument('--writes', type=int, default=200, help='strings created per writer')
+    parser.add_argument('--size', type=int, default=200, help='characters per string')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'tuned'])
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_profile(args)
+        return
+
+    print(f"{args.writers} writers x {args.writes} writes")
+    print(f"{'profile':>8} {'writes/s':>9} {'created':>8} {'locked':>7} {'lock %':>7}")
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                'SQLITE_PROFILE': profile,
+                'SQLITE_PATH': os.path.join(directory, 'bench.sqlite3'),
+                'SECRET_KEY': os.environ.get('SECRET_KEY', 'benchmark-only-secret-key'),
+            }
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.sqlite_writers', '--child',
+                 '--writers', str(args.writers), '--writes', str(args.writes), '--size', str(args.size)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        result = json.loads(output.splitlines()[-1])
+        attempted = result['created'] + result['locked']
+        print(
+            f"{profile:>8} {result['created'] / result['seconds']:>9.1f} {result['created']:>8} "
+            f"{result['locked']:>7} {100 * result['locked'] / attempted:>6.1f}%"
+        )
+
+
+if __name__ == '__main__':
+    main()
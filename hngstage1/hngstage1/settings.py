@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'strings.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,13 +77,88 @@ WSGI_APPLICATION = 'hngstage1.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# SQLITE_PROFILE selects how each new connection is tuned:
+# 'tuned' (the default) uses WAL journaling with synchronous=NORMAL, a 64 MiB
+#   page cache, memory-mapped reads, a busy timeout and persistent connections,
+#   and opens transactions with BEGIN IMMEDIATE, so concurrent writers queue on
+#   the busy timeout instead of failing with "database is locked";
+# 'default' keeps SQLite's and Django's defaults.
+
+SQLITE_PROFILE = config('SQLITE_PROFILE', default='tuned')
+
+SQLITE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                'PRAGMA synchronous=NORMAL',
+                f"PRAGMA cache_size=-{config('SQLITE_CACHE_SIZE_KIB', default=64 * 1024, cast=int)}",
+                f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)}",
+                'PRAGMA temp_store=MEMORY',
+            ]),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+        },
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('SQLITE_PATH', default=BASE_DIR / 'db.sqlite3'),
+        **SQLITE_PROFILES[SQLITE_PROFILE],
+    }
+}
+
+# DB_ENGINE=postgresql switches to PostgreSQL, configured from POSTGRES_*
+# variables (requires psycopg). character_frequency_map is then stored as JSONB
+# with a GIN index; import an existing SQLite database with
+# `python manage.py import_sqlite path/to/db.sqlite3`.
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': config('POSTGRES_DB', default='hngstage1'),
+        'USER': config('POSTGRES_USER', default='postgres'),
+        'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+        'HOST': config('POSTGRES_HOST', default='localhost'),
+        'PORT': config('POSTGRES_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The strings API caches responses in STRINGS_CACHE_ALIAS (see strings/cache.py).
+# The default is an in-process LRU per worker; set STRINGS_CACHE_BACKEND and
+# STRINGS_CACHE_LOCATION to a shared backend such as
+# django.core.cache.backends.redis.RedisCache when running several workers.
+
+STRINGS_CACHE_BACKEND = config(
+    'STRINGS_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'strings': {
+        'BACKEND': STRINGS_CACHE_BACKEND,
+        'LOCATION': config('STRINGS_CACHE_LOCATION', default='strings'),
+    },
 }
 
+if STRINGS_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['strings']['OPTIONS'] = {
+        'MAX_ENTRIES': config('STRINGS_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -104,7 +180,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'strings.renderers.FastJSONRenderer',
     ]
 }
 
@@ -131,3 +207,67 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Strings API
+# GET /strings pages through results with a keyset cursor; ?stream=ndjson|json
+# iterates the whole result set in chunks of STRINGS_STREAM_CHUNK_SIZE rows.
+
+STRINGS_PAGE_SIZE = config('STRINGS_PAGE_SIZE', default=100, cast=int)
+
+STRINGS_MAX_PAGE_SIZE = config('STRINGS_MAX_PAGE_SIZE', default=1000, cast=int)
+
+STRINGS_STREAM_CHUNK_SIZE = config('STRINGS_STREAM_CHUNK_SIZE', default=2000, cast=int)
+
+# POST /strings/batch limits: items accepted per request, rows per INSERT.
+
+STRINGS_BATCH_MAX_ITEMS = config('STRINGS_BATCH_MAX_ITEMS', default=10000, cast=int)
+
+STRINGS_BULK_CREATE_BATCH_SIZE = config('STRINGS_BULK_CREATE_BATCH_SIZE', default=500, cast=int)
+
+# DELETE /strings removes the matching strings this many rows per transaction.
+
+STRINGS_DELETE_BATCH_SIZE = config('STRINGS_DELETE_BATCH_SIZE', default=1000, cast=int)
+
+# Where compute_properties runs: 'inline', 'thread' or 'process' (see
+# strings/executor.py). Work smaller than the offload threshold, in characters,
+# always runs inline. MAX_WORKERS of 0 means one worker per CPU.
+
+STRINGS_ANALYSIS_BACKEND = config('STRINGS_ANALYSIS_BACKEND', default='inline')
+
+STRINGS_ANALYSIS_MAX_WORKERS = config('STRINGS_ANALYSIS_MAX_WORKERS', default=0, cast=int)
+
+STRINGS_ANALYSIS_OFFLOAD_THRESHOLD = config('STRINGS_ANALYSIS_OFFLOAD_THRESHOLD', default=1_000_000, cast=int)
+
+# POST /strings/upload reads bodies in chunks of this many bytes, up to a limit.
+
+STRINGS_UPLOAD_CHUNK_SIZE = config('STRINGS_UPLOAD_CHUNK_SIZE', default=64 * 1024, cast=int)
+
+STRINGS_UPLOAD_MAX_BYTES = config('STRINGS_UPLOAD_MAX_BYTES', default=200 * 1024 * 1024, cast=int)
+
+# Response cache: detail entries live until deleted; list/filter entries also
+# expire after STRINGS_FILTER_CACHE_TIMEOUT seconds.
+
+STRINGS_CACHE_ALIAS = 'strings'
+
+STRINGS_FILTER_CACHE_TIMEOUT = config('STRINGS_FILTER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Number of distinct normalized natural-language queries whose parse is memoized.
+
+STRINGS_NL_QUERY_CACHE_SIZE = config('STRINGS_NL_QUERY_CACHE_SIZE', default=1024, cast=int)
+
+# GET /strings/stats returns at most this many of the most common characters.
+
+STRINGS_STATS_MAX_TOP_CHARACTERS = config('STRINGS_STATS_MAX_TOP_CHARACTERS', default=100, cast=int)
+
+# Serve the list, detail and natural-language endpoints from the async views
+# in strings/async_views.py; use with an ASGI server (hngstage1/asgi.py).
+
+STRINGS_ASYNC_VIEWS = config('STRINGS_ASYNC_VIEWS', default=False, cast=bool)
+
+# Per-request latency, query, analysis and serialization metrics, served at
+# /metrics; STRINGS_SERVER_TIMING also reports them in a Server-Timing header.
+
+STRINGS_METRICS = config('STRINGS_METRICS', default=True, cast=bool)
+
+STRINGS_SERVER_TIMING = config('STRINGS_SERVER_TIMING', default=False, cast=bool)
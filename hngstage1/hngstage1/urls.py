@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include, re_path
+from strings.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('strings', include('strings.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('strings', include('strings.async_urls' if settings.STRINGS_ASYNC_VIEWS else 'strings.urls')),
     # re_path(r'^strings/?$', include('strings.urls')),
 ]
@@ -0,0 +1,54 @@
+"""
+String analysis with no Django dependencies, so it can run in worker processes.
+"""
+
+from collections import Counter
+import hashlib
+import re
+
+
+# Runs of non-whitespace, matching the words str.split() would return.
+WORD_RE = re.compile(r'\S+')
+
+
+def hash_value(value):
+    """Return the hex SHA-256 of a string, which is also its primary key."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def compute_properties(value):
+    """Compute all properties for a given string."""
+    # SHA-256 hash
+    sha256_hash = hash_value(value)
+
+    # Length
+    length = len(value)
+
+    # Character frequency map (Counter keeps first-occurrence order)
+    character_frequency_map = dict(Counter(value))
+
+    # Unique characters
+    unique_characters = len(character_frequency_map)
+
+    # Is palindrome (case-insensitive): compare the first half with the
+    # reversed second half rather than building a full reversed copy
+    normalized = value.lower()
+    half = len(normalized) // 2
+    is_palindrome = normalized[:half] == normalized[:len(normalized) - half - 1:-1]
+
+    # Word count, without materializing value.split(); a string with no
+    # whitespace at all is a single word
+    if any(char.isspace() for char in character_frequency_map):
+        word_count = sum(1 for _ in WORD_RE.finditer(value))
+    else:
+        word_count = 1 if value else 0
+
+    return {
+        'id': sha256_hash,
+        'length': length,
+        'is_palindrome': is_palindrome,
+        'unique_characters': unique_characters,
+        'word_count': word_count,
+        'sha256_hash': sha256_hash,
+        'character_frequency_map': character_frequency_map
+    }
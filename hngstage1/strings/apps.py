@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class StringsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'strings'
+
+    def ready(self):
+        from . import metrics
+
+        # Time every query on every connection, including the async views' threads
+        connection_created.connect(metrics.install_query_timer)
@@ -0,0 +1,17 @@
+from django.urls import path, re_path
+from django.views.decorators.csrf import csrf_exempt
+from .async_views import AsyncStringListCreateView, AsyncStringDetailView, AsyncStringByIdView, AsyncNaturalLanguageFilterView
+from .views import StringBatchView, StringUploadView, StringStatsView, CharacterStatsView
+
+# Same routes as urls.py, with the hot endpoints served by async views. DRF
+# views are CSRF-exempt by default; the plain async views are exempted here.
+urlpatterns = [
+    path('', csrf_exempt(AsyncStringListCreateView.as_view()), name='string-list-create'),
+    path('/batch', StringBatchView.as_view(), name='string-batch'),
+    path('/upload', StringUploadView.as_view(), name='string-upload'),
+    path('/stats', StringStatsView.as_view(), name='string-stats'),
+    path('/stats/characters', CharacterStatsView.as_view(), name='string-character-stats'),
+    path('/filter-by-natural-language', AsyncNaturalLanguageFilterView.as_view(), name='string-natural-language-filter'),
+    re_path(r'^/by-id/(?P<string_id>[0-9a-fA-F]{64})$', csrf_exempt(AsyncStringByIdView.as_view()), name='string-by-id'),
+    path('/<path:string_value>', csrf_exempt(AsyncStringDetailView.as_view()), name='string-detail'),
+]
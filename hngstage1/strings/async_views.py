@@ -0,0 +1,259 @@
+"""
+Async (ASGI) variants of the list, create, detail and natural-language views.
+
+Served instead of the DRF views in ``views.py`` when ``STRINGS_ASYNC_VIEWS``
+is set. They read through Django's async ORM and the async cache helpers, so
+a request never holds a worker thread while it waits on I/O, and they return
+byte-identical responses to their synchronous counterparts.
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+
+from . import cache
+from .analysis import hash_value
+from .executor import aanalyze
+from .filters import ConflictingFilters, InvalidFilter, afilter_strings, check_conflicts, parse_list_filters
+from .models import AnalyzedString
+from .nlquery import parse_query
+from .pagination import InvalidPageParameter, apaginate_queryset, parse_flag, stream_queryset
+from .renderers import dumps
+from .serializers import (
+    ROW_FIELDS, CreateStringSerializer, InvalidProjection, Projection,
+    represent_instance, represent_row,
+)
+from .views import parse_purge_request, purge_strings
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(dumps(data), status=status, content_type='application/json', headers=headers)
+
+
+def error_response(message, status):
+    return json_response({"error": message}, status=status)
+
+
+def filter_response(data, cache_outcome, etag):
+    """Respond with a list/filter payload, exposing its count as X-Total-Count."""
+    headers = {'X-Cache': cache_outcome, 'ETag': etag}
+    if 'count' in data:
+        headers['X-Total-Count'] = str(data['count'])
+    return json_response(data, headers=headers)
+
+
+def not_modified(etag):
+    return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+async def aquery_result(queryset, request, projection):
+    """Async variant of ``views.query_result``."""
+    if parse_flag(request.GET, 'exists'):
+        return {'exists': await queryset.aexists()}
+    if request.method == 'HEAD' or parse_flag(request.GET, 'count_only'):
+        return {'count': await queryset.acount()}
+    rows, count, next_url = await apaginate_queryset(queryset, request, projection)
+    return {'data': rows, 'count': count, 'next': next_url}
+
+
+class AsyncStringListCreateView(View):
+    """
+    GET /strings - List strings with optional filtering (keyset-paginated or streamed)
+    HEAD /strings - Count strings matching the filters
+    POST /strings - Create/Analyze a new string (JSON body)
+    DELETE /strings - Delete every string matching the filters
+    """
+
+    async def get(self, request):
+        """Get all strings with optional filtering."""
+        try:
+            stream = request.GET.get('stream')
+            if stream is None:
+                cache_key = await cache.afilter_key(request)
+                etag = cache.filter_etag(cache_key)
+                if cache.etag_matches(request, etag):
+                    return not_modified(etag)
+                cached = await cache.aget_filtered(cache_key)
+                if cached is not None:
+                    return filter_response(cached, cache.HIT, etag)
+
+            filters_applied = parse_list_filters(request.GET)
+            queryset = await afilter_strings(filters_applied)
+            projection = Projection.from_query_params(request.GET)
+
+            if stream is not None:
+                return stream_queryset(queryset, stream, projection, is_async=True)
+
+            data = {
+                **await aquery_result(queryset, request, projection),
+                'filters_applied': filters_applied
+            }
+            await cache.aset_filtered(cache_key, data)
+            return filter_response(data, cache.MISS, etag)
+
+        except (InvalidFilter, InvalidPageParameter, InvalidProjection) as e:
+            return error_response(str(e), status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return error_response(f"An error occurred: {str(e)}", status.HTTP_400_BAD_REQUEST)
+
+    async def head(self, request):
+        """Count the matching strings; the count is sent as X-Total-Count."""
+        return await self.get(request)
+
+    async def delete(self, request):
+        """Delete the strings matching the filters, in bounded batches."""
+        try:
+            filters_applied = parse_purge_request(request.GET)
+        except (InvalidFilter, InvalidPageParameter) as e:
+            return error_response(str(e), status.HTTP_400_BAD_REQUEST)
+
+        # Each batch is its own transaction, so run the purge on the ORM's thread
+        deleted = await sync_to_async(purge_strings)(filters_applied)
+        return json_response({'deleted': deleted, 'filters_applied': filters_applied})
+
+    async def post(self, request):
+        """Create and analyze a new string."""
+        try:
+            body = json.loads(request.body)
+        except ValueError:
+            return error_response("Request body must be valid JSON.", status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(body, dict) or 'value' not in body:
+            return error_response("Missing 'value' field in request body.", status.HTTP_400_BAD_REQUEST)
+
+        # Same validation (and whitespace trimming) as the synchronous view
+        serializer = CreateStringSerializer(data=body)
+        if not serializer.is_valid():
+            if 'value' in serializer.errors:
+                return error_response(
+                    "Invalid data type for 'value'. Must be a string.",
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            return json_response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        value = serializer.validated_data['value']
+        analyzed_string = AnalyzedString.from_value(value, await aanalyze(value))
+        try:
+            await analyzed_string.asave(force_insert=True)
+        except IntegrityError:
+            return error_response("String already exists in the system.", status.HTTP_409_CONFLICT)
+        except Exception as e:
+            return error_response(f"An error occurred: {str(e)}", status.HTTP_400_BAD_REQUEST)
+
+        return json_response(represent_instance(analyzed_string), status=status.HTTP_201_CREATED)
+
+
+class AsyncStringDetailView(View):
+    """
+    GET /strings/{string_value} - Get a specific string
+    DELETE /strings/{string_value} - Delete a specific string
+    """
+
+    def get_string_id(self):
+        """Return the primary key addressed by the URL: the SHA-256 of the value."""
+        return hash_value(self.kwargs['string_value'])
+
+    async def get(self, request, **kwargs):
+        """Get a specific string by its primary key."""
+        string_id = self.get_string_id()
+        etag = cache.detail_etag(string_id)
+        cached = await cache.aget_detail(string_id)
+        if cached is not None and cache.is_per_process() and not (
+            await AnalyzedString.objects.filter(pk=string_id).aexists()
+        ):
+            await cache.ainvalidate([string_id])
+            cached = None
+        if cache.etag_matches(request, etag) and (
+            cached is not None or await AnalyzedString.objects.filter(pk=string_id).aexists()
+        ):
+            return not_modified(etag)
+        if cached is not None:
+            return json_response(cached, headers={'X-Cache': cache.HIT, 'ETag': etag})
+
+        row = await AnalyzedString.objects.filter(pk=string_id).values_list(*ROW_FIELDS).afirst()
+        if row is None:
+            return error_response("String does not exist in the system.", status.HTTP_404_NOT_FOUND)
+        data = represent_row(row)
+        await cache.aset_detail(string_id, data)
+        return json_response(data, headers={'X-Cache': cache.MISS, 'ETag': etag})
+
+    async def delete(self, request, **kwargs):
+        """Delete a specific string by its primary key."""
+        string_id = self.get_string_id()
+        deleted, _ = await AnalyzedString.objects.filter(pk=string_id).adelete()
+        if not deleted:
+            return error_response("String does not exist in the system.", status.HTTP_404_NOT_FOUND)
+        await cache.ainvalidate([string_id])
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncStringByIdView(AsyncStringDetailView):
+    """
+    GET /strings/by-id/{sha256} - Get a specific string by its ID
+    DELETE /strings/by-id/{sha256} - Delete a specific string by its ID
+    """
+
+    def get_string_id(self):
+        return self.kwargs['string_id'].lower()
+
+
+class AsyncNaturalLanguageFilterView(View):
+    """
+    GET /strings/filter-by-natural-language - Filter strings using natural language query
+    HEAD /strings/filter-by-natural-language - Count strings matching the query
+    """
+
+    async def head(self, request):
+        """Count the matching strings; the count is sent as X-Total-Count."""
+        return await self.get(request)
+
+    async def get(self, request):
+        """Filter strings using natural language query."""
+        query = request.GET.get('query', '')
+
+        if not query:
+            return error_response("Missing 'query' parameter.", status.HTTP_400_BAD_REQUEST)
+
+        cache_key = await cache.afilter_key(request)
+        etag = cache.filter_etag(cache_key)
+        if cache.etag_matches(request, etag):
+            return not_modified(etag)
+        cached = await cache.aget_filtered(cache_key)
+        if cached is not None:
+            return filter_response(cached, cache.HIT, etag)
+
+        try:
+            parsed_filters = parse_query(query)
+
+            if not parsed_filters:
+                return error_response("Unable to parse natural language query.", status.HTTP_400_BAD_REQUEST)
+
+            try:
+                check_conflicts(parsed_filters)
+            except ConflictingFilters:
+                return error_response(
+                    "Query parsed but resulted in conflicting filters.",
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+
+            queryset = await afilter_strings(parsed_filters)
+
+            projection = Projection.from_query_params(request.GET)
+            data = {
+                **await aquery_result(queryset, request, projection),
+                'interpreted_query': {
+                    'original': query,
+                    'parsed_filters': parsed_filters
+                }
+            }
+            await cache.aset_filtered(cache_key, data)
+            return filter_response(data, cache.MISS, etag)
+
+        except (InvalidPageParameter, InvalidProjection) as e:
+            return error_response(str(e), status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return error_response(f"An error occurred: {str(e)}", status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,159 @@
+"""
+Read-through response cache for the strings API.
+
+Detail responses are content-addressed by ID and immutable, so they are cached
+until the string is deleted. List and filter responses are cached under a key
+built from the normalized query string and the write generation: a counter in
+the statistics table that every insert and delete bumps in its own
+transaction, so a committed write orphans all earlier filter entries in every
+worker at once.
+
+The same keys double as ETags: a detail response's strong ETag is the string's
+ID, and a list/filter response's weak ETag is its generation and query digest,
+so ``If-None-Match`` revalidations are answered with 304 after reading only
+the generation.
+
+The cache alias is ``STRINGS_CACHE_ALIAS``. The default in-process backend is
+per worker and never hears of another worker's deletes, so detail entries read
+from it are served only after a primary-key existence check; point it at a
+shared backend (e.g. Redis) for invalidation to reach every worker instead.
+"""
+
+from collections import Counter
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.http import parse_etags
+
+
+HIT = 'HIT'
+MISS = 'MISS'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.STRINGS_CACHE_ALIAS]
+
+
+def is_per_process():
+    """Whether the cache lives in this process, so other workers' deletes never reach it."""
+    return isinstance(get_cache(), LocMemCache)
+
+
+def record(kind, outcome):
+    with _stats_lock:
+        _stats[(kind, outcome)] += 1
+
+
+def stats():
+    """Return hit/miss counters per cache kind, e.g. {'detail': {'hits': 3, 'misses': 1}}."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    return {
+        kind: {'hits': snapshot.get((kind, HIT), 0), 'misses': snapshot.get((kind, MISS), 0)}
+        for kind in ('detail', 'filter')
+    }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_generation():
+    """Return the current write generation, as committed to the database."""
+    # Imported here: the models import the executor, which imports metrics and this module
+    from .models import StringStatistic
+    return StringStatistic.generation()
+
+
+def detail_key(string_id):
+    return f'strings:detail:{string_id}'
+
+
+def filter_key(request):
+    """Key a list/filter request by method, path, host and its sorted query parameters."""
+    params = sorted(
+        (key, value) for key, values in request.GET.lists() for value in values
+    )
+    # HEAD requests cache a count-only payload under their own key
+    normalized = repr((request.method, request.get_host(), request.path, params))
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f'strings:filter:{get_generation()}:{digest}'
+
+
+def detail_etag(string_id):
+    """Strong ETag of a detail response: content-addressed by the string's ID."""
+    return f'"{string_id}"'
+
+
+def filter_etag(key):
+    """Weak ETag of a list/filter response cached under ``key`` (see ``filter_key``)."""
+    generation, digest = key.split(':')[2:]
+    return f'W/"{generation}-{digest[:32]}"'
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match names ``etag`` (weak comparison)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or any(
+        candidate.removeprefix('W/') == etag.removeprefix('W/') for candidate in candidates
+    )
+
+
+def get_detail(string_id):
+    data = get_cache().get(detail_key(string_id))
+    record('detail', MISS if data is None else HIT)
+    return data
+
+
+def set_detail(string_id, data):
+    get_cache().set(detail_key(string_id), data, timeout=None)
+
+
+def get_filtered(key):
+    data = get_cache().get(key)
+    record('filter', MISS if data is None else HIT)
+    return data
+
+
+def set_filtered(key, data):
+    get_cache().set(key, data, timeout=settings.STRINGS_FILTER_CACHE_TIMEOUT)
+
+
+def invalidate(string_ids):
+    """
+    Invalidate cached detail responses after strings are deleted.
+
+    Filter entries need no invalidation: the write bumped the generation
+    their keys are built from. Inside a transaction this runs immediately and
+    again on commit, so neither the writer nor a reader that cached pre-commit
+    data can see stale entries.
+    """
+    def run():
+        get_cache().delete_many([detail_key(string_id) for string_id in string_ids])
+    run()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(run)
+
+
+# Async variants for the ASGI views. Like Django's own async cache methods,
+# they run the synchronous backend calls off the event loop; filter_key reads
+# the generation through the ORM, so it runs in the thread that owns the
+# connection.
+afilter_key = sync_to_async(filter_key)
+aget_filtered = sync_to_async(get_filtered, thread_sensitive=False)
+aset_filtered = sync_to_async(set_filtered, thread_sensitive=False)
+aget_detail = sync_to_async(get_detail, thread_sensitive=False)
+aset_detail = sync_to_async(set_detail, thread_sensitive=False)
+ainvalidate = sync_to_async(invalidate, thread_sensitive=False)
@@ -0,0 +1,98 @@
+"""
+Pluggable execution backends for string analysis.
+
+``STRINGS_ANALYSIS_BACKEND`` selects where analysis runs:
+
+* ``inline``  - on the calling (request) thread
+* ``thread``  - on a shared ThreadPoolExecutor
+* ``process`` - on a shared ProcessPoolExecutor, off the GIL
+
+Only work of at least ``STRINGS_ANALYSIS_OFFLOAD_THRESHOLD`` characters (a
+single value, or a whole batch) leaves the calling thread; smaller work is
+cheaper to run inline than to hand off.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import atexit
+import os
+import threading
+
+from django.conf import settings
+
+from . import metrics
+from .analysis import compute_properties
+
+
+BACKENDS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_max_workers():
+    return settings.STRINGS_ANALYSIS_MAX_WORKERS or os.cpu_count() or 1
+
+
+def get_executor(backend=None):
+    """Return the shared executor for ``backend`` (default: the configured one), or None for inline."""
+    backend = backend or settings.STRINGS_ANALYSIS_BACKEND
+    if backend == 'inline':
+        return None
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown STRINGS_ANALYSIS_BACKEND {backend!r}.")
+    with _lock:
+        if backend not in _executors:
+            _executors[backend] = BACKENDS[backend](max_workers=get_max_workers())
+        return _executors[backend]
+
+
+def should_offload(size):
+    return size >= settings.STRINGS_ANALYSIS_OFFLOAD_THRESHOLD
+
+
+def analyze(value):
+    """Compute the properties of one string on the configured backend."""
+    executor = get_executor()
+    with metrics.timed('analysis'):
+        if executor is None or not should_offload(len(value)):
+            return compute_properties(value)
+        return executor.submit(compute_properties, value).result()
+
+
+def analyze_many(values, backend=None):
+    """
+    Compute the properties of many strings, fanning out across workers.
+
+    An explicit ``backend`` overrides the configured one and is used whatever
+    the size of the batch.
+    """
+    executor = get_executor(backend)
+    with metrics.timed('analysis'):
+        if executor is None or not (backend or should_offload(sum(map(len, values)))):
+            return [compute_properties(value) for value in values]
+        chunksize = max(1, len(values) // (get_max_workers() * 4))
+        return list(executor.map(compute_properties, values, chunksize=chunksize))
+
+
+async def aanalyze(value):
+    """
+    Async variant of ``analyze``. Work above the offload threshold never runs
+    on the event loop: with the inline backend it goes to the thread pool.
+    """
+    with metrics.timed('analysis'):
+        if not should_offload(len(value)):
+            return compute_properties(value)
+        executor = get_executor() or get_executor('thread')
+        return await asyncio.wrap_future(executor.submit(compute_properties, value))
+
+
+@atexit.register
+def shutdown():
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
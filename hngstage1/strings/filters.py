@@ -0,0 +1,210 @@
+"""
+Filters shared by the list and natural-language endpoints, sync and async.
+
+``parse_list_filters`` validates GET /strings query parameters into the
+``filters_applied`` dict; the natural-language parser produces the same
+shape, plus word-count ranges and several required or excluded characters.
+``filter_strings``/``afilter_strings`` compile it into a single Q tree and
+return the queryset filtering on it.
+
+SQLite is built here without STAT4, so ANALYZE tells its planner nothing
+about how many rows a length or word-count range matches, and it would scan
+the keyset index row by row even for narrow ranges. On SQLite those ranges
+are therefore wrapped in ``likelihood()`` with the selectivity estimated from
+the maintained histograms: a narrow range is searched on its index, a wide
+one read in keyset order until the page is full.
+"""
+
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, Func, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AnalyzedString, CharacterRollup, StringStatistic
+
+
+# Filter keys mapped to the column lookup they compile to.
+FIELD_LOOKUPS = {
+    'is_palindrome': 'is_palindrome',
+    'min_length': 'length__gte',
+    'max_length': 'length__lte',
+    'word_count': 'word_count',
+    'min_word_count': 'word_count__gte',
+    'max_word_count': 'word_count__lte',
+    'created_before': 'created_at__lt',
+}
+
+
+# Range filters per histogram dimension: (minimum key, maximum key).
+RANGE_FILTERS = {
+    StringStatistic.LENGTH: ('min_length', 'max_length'),
+    StringStatistic.WORD_COUNT: ('min_word_count', 'max_word_count'),
+}
+
+
+class Likelihood(Func):
+    """SQLite's ``likelihood(X, P)``: X, with the planner told it holds for a fraction P of rows."""
+    
+    function = 'likelihood'
+    output_field = BooleanField()
+    
+    def __init__(self, condition, probability):
+        super().__init__(ExpressionWrapper(condition, output_field=BooleanField()))
+        self.probability = float(probability)
+    
+    def as_sql(self, compiler, connection, **extra_context):
+        # The planner only reads a literal probability, not a bound parameter
+        template = f'%(function)s(%(expressions)s, {self.probability!r})'
+        return super().as_sql(compiler, connection, template=template, **extra_context)
+
+
+class InvalidFilter(ValueError):
+    """Raised when a list filter query parameter is invalid."""
+
+
+class ConflictingFilters(ValueError):
+    """Raised when filters can never match together, such as min_length > max_length."""
+
+
+def parse_list_filters(query_params):
+    """Validate the filter query parameters of GET /strings."""
+    filters = {}
+
+    is_palindrome = query_params.get('is_palindrome')
+    if is_palindrome is not None:
+        if is_palindrome.lower() == 'true':
+            filters['is_palindrome'] = True
+        elif is_palindrome.lower() == 'false':
+            filters['is_palindrome'] = False
+        else:
+            raise InvalidFilter("Invalid value for is_palindrome. Use 'true' or 'false'.")
+
+    for name in ('min_length', 'max_length', 'word_count'):
+        value = query_params.get(name)
+        if value is not None:
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                raise InvalidFilter(f"Invalid value for {name}. Must be an integer.")
+
+    contains_character = query_params.get('contains_character')
+    if contains_character is not None:
+        if len(contains_character) != 1:
+            raise InvalidFilter("contains_character must be a single character.")
+        filters['contains_character'] = contains_character
+
+    return filters
+
+
+def parse_delete_filters(query_params):
+    """
+    Validate the filter query parameters of DELETE /strings: those of GET
+    /strings plus ``created_before``, an ISO 8601 date or datetime.
+    """
+    filters = parse_list_filters(query_params)
+
+    created_before = query_params.get('created_before')
+    if created_before is not None:
+        try:
+            value = parse_datetime(created_before)
+        except ValueError:
+            value = None
+        if value is None:
+            raise InvalidFilter("Invalid value for created_before. Use an ISO 8601 datetime.")
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        filters['created_before'] = value
+
+    return filters
+
+
+def required_characters(filters):
+    """Return the characters a string must contain to match ``filters``."""
+    if 'contains_character' in filters:
+        return [filters['contains_character']]
+    return filters.get('contains_characters', [])
+
+
+def check_conflicts(filters):
+    """Raise ``ConflictingFilters`` if no string could satisfy ``filters``."""
+    for low, high in [('min_length', 'max_length'), ('min_word_count', 'max_word_count')]:
+        if filters.get(low, 0) > filters.get(high, float('inf')):
+            raise ConflictingFilters(f"{low} is greater than {high}.")
+    word_count = filters.get('word_count')
+    if word_count is not None and not (
+        filters.get('min_word_count', word_count) <= word_count <= filters.get('max_word_count', word_count)
+    ):
+        raise ConflictingFilters("word_count is outside the word count range.")
+    if set(required_characters(filters)) & set(filters.get('excludes_characters', ())):
+        raise ConflictingFilters("A character is both required and excluded.")
+
+
+def range_dimensions(queryset, filters):
+    """The histogram dimensions whose ranges need a ``likelihood()`` hint on ``queryset``'s database."""
+    if connections[queryset.db].vendor != 'sqlite':
+        return []
+    return [
+        dimension for dimension, names in RANGE_FILTERS.items()
+        if any(name in filters for name in names)
+    ]
+
+
+def filters_to_q(queryset, filters, counts=None):
+    """
+    Compile ``filters`` into one Q tree over ``queryset``'s model, so the
+    whole filter is pushed down to the database as a single WHERE clause.
+    
+    With ``counts`` (from ``StringStatistic.counts``) the length and
+    word-count ranges are wrapped in ``Likelihood`` with their estimated
+    selectivity.
+    """
+    hinted = {} if counts is None else RANGE_FILTERS
+    q = Q()
+    for name, lookup in FIELD_LOOKUPS.items():
+        if name in filters and not any(name in names for names in hinted.values()):
+            q &= Q(**{lookup: filters[name]})
+    for dimension, (low, high) in hinted.items():
+        bounds = [name for name in (low, high) if name in filters]
+        if bounds:
+            q &= Likelihood(
+                Q(*[Q(**{FIELD_LOOKUPS[name]: filters[name]}) for name in bounds]),
+                StringStatistic.fraction(counts, dimension, filters.get(low), filters.get(high)),
+            )
+    for char in required_characters(filters):
+        q &= queryset.character_q(char)
+    for char in filters.get('excludes_characters', ()):
+        q &= ~queryset.character_q(char)
+    return q
+
+
+def apply_filters(queryset, filters, counts=None):
+    """Apply a filters dict (as returned by ``parse_list_filters``) to ``queryset``."""
+    return queryset.filter(filters_to_q(queryset, filters, counts))
+
+
+def filter_strings(filters):
+    """
+    Return the strings matching ``filters``, answering a filter on required
+    characters from the character rollup without touching the strings table
+    when no stored string contains one of them.
+    """
+    queryset = AnalyzedString.objects.all()
+    dimensions = range_dimensions(queryset, filters)
+    counts = StringStatistic.counts([StringStatistic.TOTAL, *dimensions]) if dimensions else None
+    queryset = apply_filters(queryset, filters, counts)
+    chars = required_characters(filters)
+    if chars and not CharacterRollup.objects.has_characters(chars):
+        return queryset.none()
+    return queryset
+
+
+async def afilter_strings(filters):
+    """Async variant of ``filter_strings``."""
+    queryset = AnalyzedString.objects.all()
+    dimensions = range_dimensions(queryset, filters)
+    counts = await StringStatistic.acounts([StringStatistic.TOTAL, *dimensions]) if dimensions else None
+    queryset = apply_filters(queryset, filters, counts)
+    chars = required_characters(filters)
+    if chars and not await CharacterRollup.objects.ahas_characters(chars):
+        return queryset.none()
+    return queryset
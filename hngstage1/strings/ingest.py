@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .executor import analyze_many
+from .models import AnalyzedString, StringCharacter, indexes_characters, record_created
+from .parsers import InvalidItem
+
+
+CREATED = 'created'
+CONFLICT = 'conflict'
+INVALID = 'invalid'
+
+CONFLICT_ERROR = "String already exists in the system."
+
+
+def extract_value(item):
+    """Return the string carried by a batch item, or raise ValueError."""
+    if isinstance(item, InvalidItem):
+        raise ValueError(item.error)
+    if isinstance(item, dict):
+        if 'value' not in item:
+            raise ValueError("Missing 'value' field.")
+        item = item['value']
+    if not isinstance(item, str):
+        raise ValueError("Value must be a string.")
+    return item
+
+
+def existing_ids(ids):
+    """Return the subset of ``ids`` already stored."""
+    ids = list(ids)
+    batch_size = settings.STRINGS_BULK_CREATE_BATCH_SIZE
+    return {
+        pk
+        for start in range(0, len(ids), batch_size)
+        for pk in AnalyzedString.objects.filter(id__in=ids[start:start + batch_size]).values_list('id', flat=True)
+    }
+
+
+def bulk_create_strings(instances):
+    """
+    Insert the analyzed strings not already stored, with their character index
+    rows (except on PostgreSQL), statistics and rollup, in one transaction.
+    
+    Returns the instances actually inserted. Existing strings are looked up
+    inside the transaction, and if another writer inserts one of the strings
+    before this insert commits, the insert is retried without it, so the
+    summaries only ever count rows this call inserted.
+    """
+    batch_size = settings.STRINGS_BULK_CREATE_BATCH_SIZE
+    unique = {}
+    for instance in instances:
+        unique.setdefault(instance.id, instance)
+    with transaction.atomic():
+        existing = existing_ids(unique)
+        while True:
+            new = [instance for pk, instance in unique.items() if pk not in existing]
+            try:
+                with transaction.atomic():
+                    AnalyzedString.objects.bulk_create(new, batch_size=batch_size)
+                break
+            except IntegrityError:
+                # Inserted concurrently since the lookup; skip those and retry
+                found = existing_ids(unique)
+                if found == existing:
+                    raise
+                existing = found
+        if indexes_characters(AnalyzedString.objects.db):
+            StringCharacter.objects.bulk_create(
+                [row for instance in new for row in instance.character_rows()], batch_size=batch_size
+            )
+        record_created(new)
+    return new
+
+
+def ingest_items(items, backend=None):
+    """
+    Analyze and insert a batch of items, returning one result per item.
+    
+    Valid values are analyzed together with ``analyze_many``, so large batches
+    fan out across the configured analysis backend. Duplicates of earlier
+    items in the batch are marked as conflicts up front, and strings already
+    stored are skipped by ``bulk_create_strings``, so one invalid or
+    conflicting item never fails the rest of the batch.
+    ``backend`` is passed on to ``analyze_many``.
+    """
+    results = []
+    values = []
+    for index, item in enumerate(items):
+        try:
+            values.append(extract_value(item))
+        except ValueError as exc:
+            results.append({'index': index, 'status': INVALID, 'error': str(exc)})
+            continue
+        results.append({'index': index, 'status': CREATED})
+    
+    pending = {}
+    analyzed = iter(zip(values, analyze_many(values, backend)))
+    for result in results:
+        if result['status'] == INVALID:
+            continue
+        instance = AnalyzedString.from_value(*next(analyzed))
+        result['id'] = instance.id
+        if instance.id in pending:
+            result.update(status=CONFLICT, error=CONFLICT_ERROR)
+        else:
+            pending[instance.id] = instance
+    
+    inserted = {instance.id for instance in bulk_create_strings(pending.values())}
+    for result in results:
+        if result['status'] == CREATED and result['id'] not in inserted:
+            result.update(status=CONFLICT, error=CONFLICT_ERROR)
+    return results
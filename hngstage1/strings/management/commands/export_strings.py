@@ -0,0 +1,60 @@
+"""
+Export every analyzed string as NDJSON, gzip-compressed by default.
+
+Rows are read with ``values_list().iterator(chunk_size=...)`` in keyset order
+and written one line at a time in the same shape as GET /strings/{value}, so
+memory use stays flat however large the table is. The output can be fed back
+to ``import_strings``.
+"""
+
+import gzip
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from strings.models import AnalyzedString
+from strings.pagination import KEYSET_ORDERING
+from strings.renderers import dumps
+from strings.serializers import ROW_FIELDS, represent_row
+
+
+class Command(BaseCommand):
+    help = "Export all strings to a (gzip-compressed) NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="file to write ('-' for stdout)")
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='rows fetched per database round trip (default: STRINGS_STREAM_CHUNK_SIZE)',
+        )
+        parser.add_argument('--no-compress', action='store_true', help='write plain NDJSON instead of gzip')
+
+    def handle(self, path, chunk_size, no_compress, **options):
+        if chunk_size is None:
+            chunk_size = settings.STRINGS_STREAM_CHUNK_SIZE
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+        rows = (
+            AnalyzedString.objects.order_by(*KEYSET_ORDERING)
+            .values_list(*ROW_FIELDS).iterator(chunk_size=chunk_size)
+        )
+
+        target = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            output = target if no_compress else gzip.GzipFile(fileobj=target, mode='wb')
+            exported = 0
+            for row in rows:
+                output.write(dumps(represent_row(row)))
+                output.write(b'\n')
+                exported += 1
+            if output is not target:
+                output.close()
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+
+        # Keep stdout clean when it carries the export
+        (self.stderr if path == '-' else self.stdout).write(
+            self.style.SUCCESS(f"Exported {exported} strings.")
+        )
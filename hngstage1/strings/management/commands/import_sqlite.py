@@ -0,0 +1,78 @@
+"""
+Copy strings from an existing SQLite database into the configured database.
+
+Only ``value`` and ``created_at`` are read from the source ``analyzed_strings``
+table, so a database from any earlier schema version can be imported; every
+property is recomputed. Strings already present are skipped, so the command
+can be re-run after an interruption.
+"""
+
+from datetime import timezone as dt_timezone
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from strings.executor import analyze_many
+from strings.ingest import bulk_create_strings
+from strings.models import AnalyzedString
+
+
+class Command(BaseCommand):
+    help = "Import the analyzed_strings table of a SQLite database file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='SQLite database file to import from')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.STRINGS_BULK_CREATE_BATCH_SIZE,
+            help='rows analyzed and inserted per transaction'
+        )
+
+    def handle(self, path, batch_size, **options):
+        try:
+            source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            rows = source.execute('SELECT value, created_at FROM analyzed_strings ORDER BY created_at')
+        except sqlite3.Error as exc:
+            raise CommandError(f"Cannot read analyzed_strings from {path}: {exc}")
+
+        imported = skipped = 0
+        try:
+            while batch := rows.fetchmany(batch_size):
+                created, duplicates = self.import_batch(batch)
+                imported += created
+                skipped += duplicates
+                self.stdout.write(f"Imported {imported} strings ({skipped} already present)")
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} strings, skipped {skipped}."))
+
+    def import_batch(self, batch):
+        values = [value for value, _ in batch]
+        instances = {}
+        for (value, created_at), properties in zip(batch, analyze_many(values)):
+            instance = AnalyzedString.from_value(value, properties)
+            instance.created_at = parse_created_at(created_at)
+            instances.setdefault(instance.id, instance)
+        created_at = {pk: instance.created_at for pk, instance in instances.items()}
+
+        # One transaction, so an interrupted import never keeps rows without their timestamps
+        with transaction.atomic():
+            new = bulk_create_strings(instances.values())
+            # bulk_create stamps auto_now_add fields; restore the source timestamps
+            for instance in new:
+                instance.created_at = created_at[instance.id]
+            AnalyzedString.objects.bulk_update(new, ['created_at'], batch_size=settings.STRINGS_BULK_CREATE_BATCH_SIZE)
+        return len(new), len(batch) - len(new)
+
+
+def parse_created_at(value):
+    """Parse a created_at column as Django's SQLite backend stores it (naive UTC)."""
+    created_at = parse_datetime(value) if isinstance(value, str) else None
+    if created_at is None:
+        return timezone.now()
+    if timezone.is_naive(created_at):
+        created_at = timezone.make_aware(created_at, dt_timezone.utc)
+    return created_at
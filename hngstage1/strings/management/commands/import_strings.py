@@ -0,0 +1,169 @@
+"""
+Import strings from an NDJSON, CSV or plain-text file.
+
+The file is read as a stream, one record at a time, and every
+``--batch-size`` records go through ``ingest_items`` - the path behind
+POST /strings/batch - so invalid records and strings already present are
+counted and skipped instead of failing the import. After each batch commits,
+the number of records consumed is written to a checkpoint file; a re-run
+resumes after the last committed batch, and the checkpoint is removed once
+the whole file has been imported.
+"""
+
+from contextlib import nullcontext
+import csv
+import gzip
+import json
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from strings.executor import BACKENDS
+from strings.ingest import CONFLICT, CREATED, INVALID, ingest_items
+from strings.parsers import InvalidItem
+
+
+FORMATS = ('ndjson', 'csv', 'text')
+
+# File extensions (before any .gz) mapped to the format they imply.
+EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.txt': 'text'}
+
+
+def guess_format(path):
+    root, extension = os.path.splitext(path)
+    if extension == '.gz':
+        root, extension = os.path.splitext(root)
+    return EXTENSIONS.get(extension.lower())
+
+
+def open_text(path):
+    """Open ``path`` ('-' for stdin) for reading text, decompressing .gz files."""
+    if path == '-':
+        return nullcontext(sys.stdin)
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_ndjson(stream, column):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield InvalidItem(f"Invalid JSON: {exc}")
+
+
+def read_csv(stream, column):
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None or column not in reader.fieldnames:
+        raise CommandError(f"CSV input has no {column!r} column.")
+    for row in reader:
+        yield row[column]
+
+
+def read_text(stream, column):
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if line:
+            yield line
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv, 'text': read_text}
+
+
+class Command(BaseCommand):
+    help = "Import strings from an NDJSON, CSV or plain-text (one string per line) file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="file to import ('-' for stdin); .gz files are decompressed")
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='input format (default: from the file extension)'
+        )
+        parser.add_argument('--column', default='value', help='CSV column holding the strings')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.STRINGS_BULK_CREATE_BATCH_SIZE,
+            help='records analyzed and inserted per transaction'
+        )
+        parser.add_argument(
+            '--backend', choices=['inline', *BACKENDS],
+            help='where to analyze each batch (default: STRINGS_ANALYSIS_BACKEND)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help="file recording progress (default: PATH.checkpoint; none for stdin)"
+        )
+        parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+
+    def handle(self, path, format, column, batch_size, backend, checkpoint, restart, **options):
+        format = format or guess_format(path)
+        if format is None:
+            raise CommandError("Cannot tell the input format from the file name; pass --format.")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        if checkpoint is None and path != '-':
+            checkpoint = f'{path}.checkpoint'
+
+        done = 0 if restart else read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f"Resuming after {done} records")
+
+        counts = {CREATED: 0, CONFLICT: 0, INVALID: 0}
+        try:
+            stream = open_text(path)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        with stream:
+            records = READERS[format](stream, column)
+            position = 0
+            batch = []
+            for record in records:
+                position += 1
+                if position <= done:
+                    continue
+                batch.append(record)
+                if len(batch) == batch_size:
+                    self.import_batch(batch, backend, counts)
+                    write_checkpoint(checkpoint, position)
+                    batch = []
+            if batch:
+                self.import_batch(batch, backend, counts)
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts[CREATED]} strings, skipped {counts[CONFLICT]} already present "
+            f"and {counts[INVALID]} invalid."
+        ))
+
+    def import_batch(self, batch, backend, counts):
+        for result in ingest_items(batch, backend):
+            counts[result['status']] += 1
+        self.stdout.write(
+            f"Imported {counts[CREATED]} strings ({counts[CONFLICT]} already present, {counts[INVALID]} invalid)"
+        )
+
+
+def read_checkpoint(checkpoint):
+    if not checkpoint or not os.path.exists(checkpoint):
+        return 0
+    try:
+        with open(checkpoint, encoding='utf-8') as f:
+            return int(json.load(f)['records'])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise CommandError(f"Unreadable checkpoint {checkpoint}: {exc}; pass --restart to start over.")
+
+
+def write_checkpoint(checkpoint, records):
+    if not checkpoint:
+        return
+    # Replace atomically, so an interrupted write never loses the old checkpoint
+    partial = f'{checkpoint}.tmp'
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump({'records': records}, f)
+    os.replace(partial, checkpoint)
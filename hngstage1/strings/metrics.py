@@ -0,0 +1,238 @@
+"""
+Process-local request metrics for the strings API.
+
+``MetricsMiddleware`` (strings/middleware.py) opens a ``RequestTimings``
+accumulator for every request. While it is open, database queries (through
+an execute wrapper installed on every connection), string analysis and JSON
+serialization add their time to it; when the response is ready the totals go
+into the histograms and counters below. ``render`` returns all of them, with
+the response cache and natural-language parse cache counters, in the
+Prometheus text exposition format served at /metrics.
+
+Like the cache statistics, the metrics are per process: scrape every worker.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+from . import cache, nlquery
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Phases timed inside a request, in Server-Timing order.
+PHASES = ('db', 'analysis', 'serialization')
+
+_lock = threading.Lock()
+_metrics = []
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing value per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = defaultdict(float)
+        _metrics.append(self)
+
+    def inc(self, amount=1, *label_values):
+        with _lock:
+            self.values[label_values] += amount
+
+    def samples(self):
+        for label_values, value in sorted(self.values.items()):
+            yield self.name, format_labels(self.labels, label_values), value
+
+    def clear(self):
+        self.values.clear()
+
+
+class Histogram:
+    """Observations counted into cumulative ``le`` buckets per label combination."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket (+Inf last), sum]
+        self.values = {}
+        _metrics.append(self)
+
+    def observe(self, value, *label_values):
+        with _lock:
+            counts = self.values.setdefault(label_values, [[0] * (len(self.buckets) + 1), 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][i] += 1
+                    break
+            else:
+                counts[0][-1] += 1
+            counts[1] += value
+
+    def samples(self):
+        for label_values, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = format_labels(self.labels + ('le',), label_values + (format_value(bound),))
+                yield f'{self.name}_bucket', labels, cumulative
+            labels = format_labels(self.labels, label_values)
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, cumulative
+
+    def clear(self):
+        self.values.clear()
+
+
+REQUEST_DURATION = Histogram(
+    'strings_http_request_duration_seconds', 'Time to produce a response, by endpoint.',
+    ('endpoint', 'method', 'status'),
+)
+DB_QUERIES = Counter('strings_db_queries_total', 'Database queries run, by endpoint.', ('endpoint',))
+DB_DURATION = Counter('strings_db_query_seconds_total', 'Time spent in database queries, by endpoint.', ('endpoint',))
+DB_QUERIES_PER_REQUEST = Histogram(
+    'strings_db_queries_per_request', 'Database queries run per request, by endpoint.',
+    ('endpoint',), QUERY_COUNT_BUCKETS,
+)
+PHASE_DURATION = Histogram(
+    'strings_phase_duration_seconds', 'Time spent analyzing strings and serializing responses.', ('phase',),
+)
+
+
+class RequestTimings:
+    """Time and call counts per phase of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def add(self, phase, seconds):
+        self.seconds[phase] += seconds
+        self.calls[phase] += 1
+
+    def server_timing(self, total):
+        """Return the value of a Server-Timing header, in milliseconds."""
+        entries = [
+            f'{phase};dur={self.seconds[phase] * 1000:.3f};desc="{self.calls[phase]}"'
+            for phase in PHASES if self.calls[phase]
+        ]
+        entries.append(f'total;dur={total * 1000:.3f}')
+        return ', '.join(entries)
+
+
+_current = ContextVar('strings_request_timings', default=None)
+
+
+def start_request():
+    """Open a ``RequestTimings`` for the current request; returns it and a reset token."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def finish_request(timings, token, endpoint, method, status):
+    """Close the request opened by ``start_request`` and record it; returns its duration."""
+    _current.reset(token)
+    total = time.perf_counter() - timings.started
+    REQUEST_DURATION.observe(total, endpoint, method, status)
+    DB_QUERIES.inc(timings.calls['db'], endpoint)
+    DB_DURATION.inc(timings.seconds['db'], endpoint)
+    DB_QUERIES_PER_REQUEST.observe(timings.calls['db'], endpoint)
+    return total
+
+
+@contextmanager
+def timed(phase):
+    """Time the enclosed block as ``phase`` of the current request, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_DURATION.observe(elapsed, phase)
+        timings = _current.get()
+        if timings is not None:
+            timings.add(phase, elapsed)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query's time to the current request."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver installing ``time_query`` on the connection."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def reset():
+    with _lock:
+        for metric in _metrics:
+            metric.clear()
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+
+    def family(name, kind, documentation, samples):
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample_name, labels, value in samples:
+            lines.append(f'{sample_name}{labels} {format_value(value)}')
+
+    with _lock:
+        for metric in _metrics:
+            family(metric.name, metric.kind, metric.documentation, list(metric.samples()))
+
+    family('strings_cache_requests_total', 'counter', 'Response cache lookups, by cache and outcome.', [
+        ('strings_cache_requests_total', format_labels(('cache', 'outcome'), (kind, outcome)), count)
+        for kind, counts in cache.stats().items()
+        for outcome, count in [('hit', counts['hits']), ('miss', counts['misses'])]
+    ])
+    info = nlquery.cache_info()
+    family('strings_nl_query_cache_requests_total', 'counter', 'Natural-language parse cache lookups, by outcome.', [
+        ('strings_nl_query_cache_requests_total', format_labels(('outcome',), ('hit',)), info.hits),
+        ('strings_nl_query_cache_requests_total', format_labels(('outcome',), ('miss',)), info.misses),
+    ])
+    family('strings_nl_query_cache_entries', 'gauge', 'Natural-language queries in the parse cache.', [
+        ('strings_nl_query_cache_entries', '', info.currsize),
+    ])
+    return '\n'.join(lines) + '\n'
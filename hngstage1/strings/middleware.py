@@ -0,0 +1,54 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, database queries, analysis and serialization time of
+    every request in ``strings.metrics``, and with ``STRINGS_SERVER_TIMING``
+    report them in a Server-Timing response header.
+
+    Streamed response bodies are produced after the middleware returns, so
+    only the time to the first byte is counted for them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STRINGS_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = metrics.start_request()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, response, timings, token)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(request, response, timings, token)
+        return response
+
+    def finish(self, request, response, timings, token):
+        match = request.resolver_match
+        endpoint = (match.url_name or match.route) if match else 'unmatched'
+        status = response.status_code if response is not None else 500
+        total = metrics.finish_request(timings, token, endpoint, request.method, status)
+        if response is not None and settings.STRINGS_SERVER_TIMING:
+            response['Server-Timing'] = timings.server_timing(total)
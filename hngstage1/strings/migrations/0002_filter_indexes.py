@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['is_palindrome', 'word_count', 'length'], name='strings_pal_words_len_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['word_count', 'length'], name='strings_words_len_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['length'], name='strings_length_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['created_at', 'id'], name='strings_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['length'], name='strings_pal_length_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['created_at', 'id'], name='strings_pal_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_strings(apps, schema_editor):
+    AnalyzedString = apps.get_model('strings', 'AnalyzedString')
+    StringCharacter = apps.get_model('strings', 'StringCharacter')
+    rows = []
+    strings = AnalyzedString.objects.values_list('id', 'character_frequency_map')
+    for string_id, frequency_map in strings.iterator(chunk_size=2000):
+        for char in {char.lower() for char in frequency_map}:
+            rows.append(StringCharacter(analyzed_string_id=string_id, character=char))
+        if len(rows) >= 5000:
+            StringCharacter.objects.bulk_create(rows)
+            rows = []
+    StringCharacter.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0002_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringCharacter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character', models.CharField(max_length=4)),
+                ('analyzed_string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='characters', to='strings.analyzedstring')),
+            ],
+            options={
+                'db_table': 'analyzed_string_characters',
+                'constraints': [models.UniqueConstraint(fields=('character', 'analyzed_string'), name='strings_character_string_uniq')],
+            },
+        ),
+        migrations.RunPython(index_existing_strings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0003_character_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='analyzedstring',
+            name='sha256_hash',
+        ),
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='value',
+            field=models.TextField(),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:41
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def bucket_for(n):
+    return n if n < 16 else 1 << (n.bit_length() - 1)
+
+
+def summarize_existing_strings(apps, schema_editor):
+    AnalyzedString = apps.get_model('strings', 'AnalyzedString')
+    StringStatistic = apps.get_model('strings', 'StringStatistic')
+    counts = Counter()
+    rows = AnalyzedString.objects.values_list('length', 'is_palindrome', 'word_count')
+    for length, is_palindrome, word_count in rows.iterator(chunk_size=2000):
+        counts[('total', 0)] += 1
+        counts[('palindrome', int(is_palindrome))] += 1
+        counts[('length', bucket_for(length))] += 1
+        counts[('word_count', bucket_for(word_count))] += 1
+    StringStatistic.objects.bulk_create([
+        StringStatistic(dimension=dimension, bucket=bucket, count=count)
+        for (dimension, bucket), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0004_hash_identity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=16)),
+                ('bucket', models.BigIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'analyzed_string_statistics',
+                'ordering': ['dimension', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'bucket'), name='strings_statistic_uniq')],
+            },
+        ),
+        migrations.RunPython(summarize_existing_strings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:42
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def roll_up_existing_strings(apps, schema_editor):
+    AnalyzedString = apps.get_model('strings', 'AnalyzedString')
+    CharacterRollup = apps.get_model('strings', 'CharacterRollup')
+    totals = Counter()
+    strings = Counter()
+    maps = AnalyzedString.objects.values_list('character_frequency_map', flat=True)
+    for frequency_map in maps.iterator(chunk_size=2000):
+        folded = Counter()
+        for char, count in frequency_map.items():
+            folded[char.lower()] += count
+        totals.update(folded)
+        strings.update(folded.keys())
+    CharacterRollup.objects.bulk_create([
+        CharacterRollup(character=char, total_count=totals[char], string_count=strings[char])
+        for char in totals
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0005_summary_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character', models.CharField(max_length=4, unique=True)),
+                ('total_count', models.BigIntegerField(default=0)),
+                ('string_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'analyzed_string_character_rollup',
+                'indexes': [models.Index(fields=['total_count'], name='strings_rollup_total_idx'), models.Index(fields=['string_count'], name='strings_rollup_strings_idx')],
+            },
+        ),
+        migrations.RunPython(roll_up_existing_strings, migrations.RunPython.noop),
+    ]
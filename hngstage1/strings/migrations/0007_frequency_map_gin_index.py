@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+INDEX_NAME = 'strings_frequency_map_gin_idx'
+
+
+def create_gin_index(apps, schema_editor):
+    # JSONField is already jsonb on PostgreSQL; other backends have no GIN
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+        'ON analyzed_strings USING gin (character_frequency_map)'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0006_character_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
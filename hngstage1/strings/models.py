@@ -1,28 +1,206 @@
-from django.db import models
-import hashlib
+from collections import Counter, defaultdict
+from functools import cache
+from django.conf import settings
+from django.db import connections, models, router, transaction
 import json
+import sys
+
+from .analysis import compute_properties
+from .executor import analyze
+
+
+# Properties stored as columns; sha256_hash is the primary key instead.
+ANALYZED_FIELDS = (
+    'length', 'is_palindrome', 'unique_characters', 'word_count', 'character_frequency_map'
+)
+
+
+# Columns the summary statistics are derived from.
+SUMMARY_FIELDS = ('length', 'is_palindrome', 'word_count')
+
+# Values below this get a bucket of their own; larger ones share power-of-two
+# buckets, so the number of buckets grows only logarithmically.
+EXACT_BUCKET_LIMIT = 16
+
+
+def fold_character(char):
+    """Case-fold a character the way contains_character lookups compare it."""
+    return char.lower()
+
+
+@cache
+def _case_variant_table():
+    # Only characters that change when folded; the rest are their own variant
+    table = defaultdict(list)
+    for codepoint in range(sys.maxunicode + 1):
+        char = chr(codepoint)
+        if fold_character(char) != char:
+            table[fold_character(char)].append(char)
+    return table
+
+
+def case_variants(char):
+    """Return every single character that folds to the same key as ``char``."""
+    folded = fold_character(char)
+    variants = list(_case_variant_table().get(folded, ()))
+    if len(folded) == 1 and fold_character(folded) == folded:
+        variants.append(folded)
+    return variants
+
+
+def bucket_for(n):
+    """Return the lower bound of the histogram bucket holding ``n``."""
+    if n < EXACT_BUCKET_LIMIT:
+        return n
+    return 1 << (n.bit_length() - 1)
+
+
+def bucket_upper_bound(bucket):
+    if bucket < EXACT_BUCKET_LIMIT:
+        return bucket
+    return bucket * 2 - 1
+
+
+def increment_many(model, key_fields, count_fields, rows):
+    """
+    Add per-row deltas to ``count_fields``, creating missing rows.
+
+    ``rows`` are tuples of the ``key_fields`` values followed by one delta
+    per count field. Each batch is a single ``INSERT ... ON CONFLICT DO
+    UPDATE`` adding the deltas to existing rows, so the number of queries
+    does not grow with the number of distinct keys.
+    """
+    if not rows:
+        return
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table = qn(opts.db_table)
+    columns = [opts.get_field(name).column for name in (*key_fields, *count_fields)]
+    batch_size = max(1, min(
+        settings.STRINGS_BULK_CREATE_BATCH_SIZE, connection.ops.bulk_batch_size(columns, rows)
+    ))
+    row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    updates = ', '.join(
+        f'{qn(column)} = {table}.{qn(column)} + EXCLUDED.{qn(column)}'
+        for column in columns[len(key_fields):]
+    )
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(map(qn, columns))}) '
+                f'VALUES {", ".join([row_sql] * len(batch))} '
+                f'ON CONFLICT ({", ".join(map(qn, columns[:len(key_fields)]))}) DO UPDATE SET {updates}',
+                [value for row in batch for value in row],
+            )
+
+
+def indexes_characters(using):
+    """
+    Whether database ``using`` answers character filters from StringCharacter
+    rows. PostgreSQL probes the GIN-indexed JSONB frequency map instead, so
+    the rows are never read there and are not written.
+    """
+    return connections[using].vendor != 'postgresql'
+
+
+def record_created(instances):
+    """Add newly inserted strings to the summary statistics and character rollup."""
+    StringStatistic.record(
+        [tuple(getattr(instance, field) for field in SUMMARY_FIELDS) for instance in instances], 1
+    )
+    CharacterRollup.record([instance.character_frequency_map for instance in instances], 1)
+
+
+class AnalyzedStringQuerySet(models.QuerySet):
+    
+    def character_q(self, char):
+        """
+        Return a Q matching strings that contain ``char`` (case-insensitively).
+        
+        Served by the (character, analyzed_string) index on StringCharacter
+        instead of a LIKE scan over every value. On PostgreSQL the JSONB
+        frequency map is probed for every case variant of ``char`` instead,
+        which the GIN index on it answers directly.
+        """
+        if not indexes_characters(self.db):
+            return models.Q(character_frequency_map__has_any_keys=case_variants(char))
+        string_ids = StringCharacter.objects.filter(
+            character=fold_character(char)
+        ).values('analyzed_string_id')
+        return models.Q(pk__in=string_ids)
+    
+    def containing_character(self, char):
+        """Case-insensitively filter to strings containing ``char``."""
+        return self.filter(self.character_q(char))
+    
+    def delete(self):
+        """Delete the matching strings and keep the summaries and rollup in step."""
+        with transaction.atomic():
+            removed = list(
+                self.order_by().select_for_update()
+                .values_list(*SUMMARY_FIELDS, 'character_frequency_map')
+            )
+            result = super().delete()
+            StringStatistic.record([row[:-1] for row in removed], -1)
+            CharacterRollup.record([row[-1] for row in removed], -1)
+        return result
+    
+    def delete_in_batches(self, batch_size):
+        """
+        Delete the matching strings ``batch_size`` primary keys at a time,
+        each batch in its own transaction so no lock is held for the whole
+        purge. Yields the primary keys and row count removed by each batch.
+        """
+        while True:
+            with transaction.atomic():
+                pks = list(self.order_by().values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    return
+                _, per_model = self.model.objects.filter(pk__in=pks).delete()
+            yield pks, per_model.get(self.model._meta.label, 0)
 
 
 class AnalyzedString(models.Model):
     """Model to store analyzed strings and their computed properties."""
     
-    # Using sha256_hash as the primary key
+    # The SHA-256 hash of value is the primary key and the only identity
+    # index; sha256_hash in API responses is an alias of it.
     id = models.CharField(max_length=64, primary_key=True, editable=False)
-    value = models.TextField(unique=True)
+    value = models.TextField()
     
     # Computed properties
     length = models.IntegerField()
     is_palindrome = models.BooleanField()
     unique_characters = models.IntegerField()
     word_count = models.IntegerField()
-    sha256_hash = models.CharField(max_length=64, unique=True)
     character_frequency_map = models.JSONField()
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = AnalyzedStringQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         db_table = 'analyzed_strings'
+        # Chosen from the filter combinations accepted by GET /strings and
+        # GET /strings/filter-by-natural-language; see FILTER_INDEX_PLANS in
+        # tests.py for the EXPLAIN check that keeps them index-served.
+        indexes = [
+            models.Index(fields=['is_palindrome', 'word_count', 'length'], name='strings_pal_words_len_idx'),
+            models.Index(fields=['word_count', 'length'], name='strings_words_len_idx'),
+            models.Index(fields=['length'], name='strings_length_idx'),
+            models.Index(fields=['created_at', 'id'], name='strings_created_idx'),
+            models.Index(
+                fields=['length'], name='strings_pal_length_idx',
+                condition=models.Q(is_palindrome=True),
+            ),
+            models.Index(
+                fields=['created_at', 'id'], name='strings_pal_created_idx',
+                condition=models.Q(is_palindrome=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.value[:50]}... (ID: {self.id[:8]}...)"
@@ -30,47 +208,266 @@ class AnalyzedString(models.Model):
     @staticmethod
     def compute_properties(value):
         """Compute all properties for a given string."""
-        # SHA-256 hash
-        sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
-        
-        # Length
-        length = len(value)
-        
-        # Is palindrome (case-insensitive)
-        normalized = value.lower()
-        is_palindrome = normalized == normalized[::-1]
-        
-        # Unique characters
-        unique_characters = len(set(value))
-        
-        # Word count
-        word_count = len(value.split())
-        
-        # Character frequency map
-        character_frequency_map = {}
-        for char in value:
-            character_frequency_map[char] = character_frequency_map.get(char, 0) + 1
-        
-        return {
-            'id': sha256_hash,
-            'length': length,
-            'is_palindrome': is_palindrome,
-            'unique_characters': unique_characters,
-            'word_count': word_count,
-            'sha256_hash': sha256_hash,
-            'character_frequency_map': character_frequency_map
-        }
+        return compute_properties(value)
+    
+    @classmethod
+    def from_value(cls, value, properties=None):
+        """Build an unsaved instance with its properties already computed."""
+        if properties is None:
+            properties = cls.compute_properties(value)
+        fields = {name: properties[name] for name in ANALYZED_FIELDS}
+        return cls(id=properties['id'], value=value, **fields)
+    
+    def character_rows(self):
+        """Build the StringCharacter rows indexing this string's characters."""
+        folded = {fold_character(char) for char in self.character_frequency_map}
+        return [StringCharacter(analyzed_string_id=self.id, character=char) for char in folded]
     
     def save(self, *args, **kwargs):
-        """Override save to compute properties automatically."""
+        """Override save to compute properties and index characters automatically."""
+        creating = self._state.adding
         if not self.id:
-            properties = self.compute_properties(self.value)
+            properties = analyze(self.value)
             self.id = properties['id']
             self.length = properties['length']
             self.is_palindrome = properties['is_palindrome']
             self.unique_characters = properties['unique_characters']
             self.word_count = properties['word_count']
-            self.sha256_hash = properties['sha256_hash']
             self.character_frequency_map = properties['character_frequency_map']
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if creating:
+                if indexes_characters(self._state.db):
+                    StringCharacter.objects.bulk_create(self.character_rows())
+                record_created([self])
+    
+    def delete(self, *args, **kwargs):
+        """Delete through the queryset so the summaries and rollup are updated."""
+        return type(self).objects.filter(pk=self.pk).delete()
+
+
+class StringCharacter(models.Model):
+    """
+    Inverted index from a case-folded character to the strings containing it.
+    
+    Not written on PostgreSQL, where the frequency map's GIN index serves
+    character filters (see ``indexes_characters``).
+    """
+    
+    analyzed_string = models.ForeignKey(
+        AnalyzedString, on_delete=models.CASCADE, related_name='characters'
+    )
+    # lower() of a single code point can expand to more than one (e.g. 'İ').
+    character = models.CharField(max_length=4)
+    
+    class Meta:
+        db_table = 'analyzed_string_characters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['character', 'analyzed_string'], name='strings_character_string_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.character!r} in {self.analyzed_string_id[:8]}..."
+
+
+
+class StringStatistic(models.Model):
+    """
+    Incrementally maintained counts behind GET /strings/stats.
+    
+    One row per (dimension, bucket): the total, palindrome/non-palindrome
+    counts and length and word-count histograms. Rows are adjusted in the same
+    transaction as every insert and delete, so reading statistics costs
+    O(buckets) instead of a scan over every string. The same writes bump the
+    GENERATION row, which versions cached list responses and their ETags.
+    """
+    
+    GENERATION = 'generation'
+    TOTAL = 'total'
+    PALINDROME = 'palindrome'
+    LENGTH = 'length'
+    WORD_COUNT = 'word_count'
+    
+    dimension = models.CharField(max_length=16)
+    bucket = models.BigIntegerField()
+    count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'analyzed_string_statistics'
+        ordering = ['dimension', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'bucket'], name='strings_statistic_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}[{self.bucket}] = {self.count}"
+    
+    @classmethod
+    def deltas(cls, rows, sign):
+        """Count (dimension, bucket) changes for (length, is_palindrome, word_count) rows."""
+        deltas = Counter()
+        for length, is_palindrome, word_count in rows:
+            deltas[(cls.TOTAL, 0)] += sign
+            deltas[(cls.PALINDROME, int(is_palindrome))] += sign
+            deltas[(cls.LENGTH, bucket_for(length))] += sign
+            deltas[(cls.WORD_COUNT, bucket_for(word_count))] += sign
+        return deltas
+    
+    @classmethod
+    def record(cls, rows, sign):
+        """Add (sign=1) or remove (sign=-1) summary rows for the given strings."""
+        changes = [
+            (dimension, bucket, delta)
+            for (dimension, bucket), delta in cls.deltas(rows, sign).items() if delta
+        ]
+        if changes:
+            changes.append((cls.GENERATION, 0, 1))
+        increment_many(cls, ('dimension', 'bucket'), ('count',), changes)
+    
+    @classmethod
+    def generation(cls):
+        """Return the write generation: the number of writes that changed the strings table."""
+        return cls.objects.filter(dimension=cls.GENERATION, bucket=0).values_list('count', flat=True).first() or 0
+    
+    @classmethod
+    async def ageneration(cls):
+        """Async variant of ``generation``."""
+        return await cls.objects.filter(dimension=cls.GENERATION, bucket=0).values_list('count', flat=True).afirst() or 0
+    
+    @classmethod
+    def _counts_query(cls, dimensions):
+        rows = cls.objects.filter(count__gt=0)
+        if dimensions is not None:
+            rows = rows.filter(dimension__in=dimensions)
+        return rows.values_list('dimension', 'bucket', 'count')
+    
+    @classmethod
+    def counts(cls, dimensions=None):
+        """Return {dimension: {bucket: count}} for ``dimensions`` (default: all)."""
+        counts = {}
+        for dimension, bucket, count in cls._counts_query(dimensions):
+            counts.setdefault(dimension, {})[bucket] = count
+        return counts
+    
+    @classmethod
+    async def acounts(cls, dimensions=None):
+        """Async variant of ``counts``."""
+        counts = {}
+        async for dimension, bucket, count in cls._counts_query(dimensions):
+            counts.setdefault(dimension, {})[bucket] = count
+        return counts
+    
+    @classmethod
+    def fraction(cls, counts, dimension, low=None, high=None):
+        """
+        Estimate from ``counts`` the fraction of strings whose ``dimension``
+        lies between ``low`` and ``high`` (inclusive), assuming values spread
+        evenly over each histogram bucket.
+        """
+        total = counts.get(cls.TOTAL, {}).get(0, 0)
+        if not total:
+            return 1.0
+        low = 0 if low is None else low
+        high = float('inf') if high is None else high
+        matched = 0
+        for bucket, count in counts.get(dimension, {}).items():
+            upper = bucket_upper_bound(bucket)
+            overlap = min(upper, high) - max(bucket, low) + 1
+            if overlap > 0:
+                matched += count * overlap / (upper - bucket + 1)
+        return min(1.0, matched / total)
+    
+    @classmethod
+    def report(cls, top_characters):
+        """Build the GET /strings/stats payload from the summary rows."""
+        counts = cls.counts()
+        
+        def histogram(dimension):
+            return [
+                {'min': bucket, 'max': bucket_upper_bound(bucket), 'count': count}
+                for bucket, count in sorted(counts.get(dimension, {}).items())
+            ]
+        
+        palindromes = counts.get(cls.PALINDROME, {})
+        return {
+            'total': counts.get(cls.TOTAL, {}).get(0, 0),
+            'palindromes': {'true': palindromes.get(1, 0), 'false': palindromes.get(0, 0)},
+            'length': histogram(cls.LENGTH),
+            'word_count': histogram(cls.WORD_COUNT),
+            'top_characters': CharacterRollup.top(top_characters),
+        }
+
+
+class CharacterRollupQuerySet(models.QuerySet):
+    
+    def has_character(self, char):
+        """Whether any stored string contains ``char`` (case-insensitively)."""
+        return self.filter(character=fold_character(char), string_count__gt=0).exists()
+    
+    async def ahas_character(self, char):
+        """Async variant of ``has_character``."""
+        return await self.filter(character=fold_character(char), string_count__gt=0).aexists()
+    
+    def _present(self, chars):
+        return self.filter(character__in=chars, string_count__gt=0)
+    
+    def has_characters(self, chars):
+        """Whether every one of ``chars`` occurs in some stored string."""
+        folded = {fold_character(char) for char in chars}
+        return self._present(folded).count() == len(folded)
+    
+    async def ahas_characters(self, chars):
+        """Async variant of ``has_characters``."""
+        folded = {fold_character(char) for char in chars}
+        return await self._present(folded).acount() == len(folded)
+
+
+class CharacterRollup(models.Model):
+    """
+    Corpus-wide totals per case-folded character.
+    
+    ``total_count`` is the number of occurrences across all strings and
+    ``string_count`` the number of strings containing the character. Both are
+    adjusted in the same transaction as every insert and delete.
+    """
+    
+    character = models.CharField(max_length=4, unique=True)
+    total_count = models.BigIntegerField(default=0)
+    string_count = models.BigIntegerField(default=0)
+    
+    objects = CharacterRollupQuerySet.as_manager()
+    
+    class Meta:
+        db_table = 'analyzed_string_character_rollup'
+        indexes = [
+            models.Index(fields=['total_count'], name='strings_rollup_total_idx'),
+            models.Index(fields=['string_count'], name='strings_rollup_strings_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.character!r}: {self.total_count} in {self.string_count} strings"
+    
+    @classmethod
+    def record(cls, frequency_maps, sign):
+        """Add (sign=1) or remove (sign=-1) the characters of the given frequency maps."""
+        totals = Counter()
+        strings = Counter()
+        for frequency_map in frequency_maps:
+            folded = Counter()
+            for char, count in frequency_map.items():
+                folded[fold_character(char)] += count
+            for char, count in folded.items():
+                totals[char] += sign * count
+                strings[char] += sign
+        increment_many(cls, ('character',), ('total_count', 'string_count'), [
+            (char, totals[char], strings[char]) for char in totals
+        ])
+    
+    @classmethod
+    def top(cls, n, order_by='total_count'):
+        """Return the ``n`` most common characters by total or string count."""
+        rows = cls.objects.filter(string_count__gt=0).order_by(f'-{order_by}', 'character')
+        return list(rows.values('character', 'total_count', 'string_count')[:n])
@@ -0,0 +1,181 @@
+"""
+Natural-language query parser for GET /strings/filter-by-natural-language.
+
+A query is scanned once with a single precompiled token pattern, and the
+tokens found are resolved into filters. Parse results are memoized per
+normalized query text in a size-bounded LRU cache, because clients send the
+same few hundred phrasings over and over.
+"""
+
+from functools import lru_cache
+import re
+
+from django.conf import settings
+
+
+# Letter lists such as "a", "a and z" or "a, b and c". The first letter keeps
+# the original parser's leniency ("the letter zebra" means z).
+LETTER_LIST = r'[a-z](?:(?:\s*,\s*(?:and\s+)?|\s+and\s+)[a-z](?![a-z]))*'
+# Bare lists without "letter"/"character" need two letters ("a and z"), so
+# "containing a word" is not read as the letter a.
+BARE_LETTER_LIST = r'[a-z](?:(?:\s*,\s*(?:and\s+)?|\s+and\s+)[a-z](?![a-z]))+'
+
+# Every token starts a word, and the lookahead rejects positions that cannot
+# start any token before the alternation is tried. Each alternative is one
+# outer named group, so ``match.lastgroup`` names the kind of token.
+TOKEN_RE = re.compile(rf'''
+    (?<![a-z0-9])(?=[abcefilmnopstw0-9])
+    (?:
+          (?P<not_palindrome>(?:not|non)(?:\s+an?)?[\s-]*palindrom(?:e|ic))
+        | (?P<palindrome>palindrom(?:e|ic))
+        | (?P<word_keyword>(?P<keyword>single|one|two|three)\s+word)
+        | (?P<word_range>(?:between\s+)?(?P<word_low>\d+)\s*(?:-|to|and)\s*(?P<word_high>\d+)\s*words?)
+        | (?P<word_bound>(?:at\s+(?P<word_at>least|most)|(?P<word_than>more|fewer|less)\s+than)\s+(?P<word_bound_count>\d+)\s*words?)
+        | (?P<words>(?P<word_count>\d+)\s*words?)
+        | (?P<length_range>(?:between\s+)?(?P<length_low>\d+)\s*(?:-|to|and)\s*(?P<length_high>\d+)\s*char)
+        | (?P<exact_length>exactly\s+(?P<exactly>\d+)\s*char|(?P<long>\d+)\s*char\w*\s+long|length\s+(?:of\s+)?(?P<length_of>\d+))
+        | (?P<than_length>(?P<than>longer|more|shorter|less|fewer)\s+than\s+(?P<than_count>\d+)\s*char)
+        | (?P<bound_length>at\s+(?P<bound>least|most)\s+(?P<bound_count>\d+)\s*char)
+        | (?P<excluded>(?:without|excluding|not\s+contain(?:s|ing)?)\s+(?:(?:the\s+)?(?:letters?|characters?)\s+(?P<excluded_letters>{LETTER_LIST})|(?P<excluded_bare>{BARE_LETTER_LIST})))
+        | (?P<letters>(?:contain(?:s|ing)?|with)\s+(?:(?:the\s+)?(?:letters?|characters?)\s+(?P<named_letters>{LETTER_LIST})|(?P<bare_letters>{BARE_LETTER_LIST})))
+        | (?P<vowel>(?P<ordinal>first|second|third|fourth|fifth)\s+vowel)
+    )
+''', re.VERBOSE)
+
+LETTER_SEPARATOR_RE = re.compile(r'\s*,\s*(?:and\s+)?|\s+and\s+')
+
+WORD_KEYWORDS = {'single': 1, 'one': 1, 'two': 2, 'three': 3}
+
+LENGTH_BOUNDS = {
+    'longer': 'min_exclusive', 'more': 'min_exclusive',
+    'shorter': 'max_exclusive', 'less': 'max_exclusive', 'fewer': 'max_exclusive',
+    'least': 'min_inclusive', 'most': 'max_inclusive',
+}
+
+VOWELS = {'first': 'a', 'second': 'e', 'third': 'i', 'fourth': 'o', 'fifth': 'u'}
+
+
+def normalize_query(query):
+    """Lowercase a query and collapse its whitespace, forming the cache key."""
+    return ' '.join(query.lower().split())
+
+
+def letters_of(letter_list):
+    # The first letter may run into a word ("the letter zebra"); the rest cannot
+    return [item[0] for item in LETTER_SEPARATOR_RE.split(letter_list)]
+
+
+def add_unique(target, letters):
+    for letter in letters:
+        if letter not in target:
+            target.append(letter)
+
+
+def _parse_normalized(query):
+    tokens = {}
+    required = []
+    excluded = []
+    for match in TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        if kind == 'letters':
+            add_unique(required, letters_of(match.group('named_letters') or match.group('bare_letters')))
+        elif kind == 'excluded':
+            add_unique(excluded, letters_of(match.group('excluded_letters') or match.group('excluded_bare')))
+        elif kind in ('palindrome', 'not_palindrome'):
+            # The first palindrome token decides, negated or not
+            tokens.setdefault('palindrome', kind == 'palindrome')
+        elif kind == 'than_length':
+            tokens.setdefault(LENGTH_BOUNDS[match.group('than')], int(match.group('than_count')))
+        elif kind == 'bound_length':
+            tokens.setdefault(LENGTH_BOUNDS[match.group('bound')], int(match.group('bound_count')))
+        else:
+            # The first occurrence of each kind of token wins
+            tokens.setdefault(kind, match)
+
+    filters = {}
+    if 'palindrome' in tokens:
+        filters['is_palindrome'] = tokens['palindrome']
+
+    if 'word_keyword' in tokens:
+        filters['word_count'] = WORD_KEYWORDS[tokens['word_keyword'].group('keyword')]
+    elif 'words' in tokens:
+        filters['word_count'] = int(tokens['words'].group('word_count'))
+    if 'word_range' in tokens:
+        low, high = sorted(int(tokens['word_range'].group(g)) for g in ('word_low', 'word_high'))
+        filters['min_word_count'] = low
+        filters['max_word_count'] = high
+    elif 'word_bound' in tokens:
+        match = tokens['word_bound']
+        bound = LENGTH_BOUNDS[match.group('word_at') or match.group('word_than')]
+        count = int(match.group('word_bound_count'))
+        if bound.startswith('min'):
+            filters['min_word_count'] = count + (bound == 'min_exclusive')
+        else:
+            filters['max_word_count'] = count - (bound == 'max_exclusive')
+
+    # Exact lengths, then ranges, then "at least"/"at most", then "longer"/"shorter than"
+    if 'exact_length' in tokens:
+        match = tokens['exact_length']
+        length = int(match.group('exactly') or match.group('long') or match.group('length_of'))
+        filters['min_length'] = filters['max_length'] = length
+    elif 'length_range' in tokens:
+        low, high = sorted(int(tokens['length_range'].group(g)) for g in ('length_low', 'length_high'))
+        filters['min_length'] = low
+        filters['max_length'] = high
+    else:
+        # "at least"/"at most" take precedence over "longer"/"shorter than"
+        if 'min_inclusive' in tokens:
+            filters['min_length'] = tokens['min_inclusive']
+        elif 'min_exclusive' in tokens:
+            filters['min_length'] = tokens['min_exclusive'] + 1
+        if 'max_inclusive' in tokens:
+            filters['max_length'] = tokens['max_inclusive']
+        elif 'max_exclusive' in tokens:
+            filters['max_length'] = tokens['max_exclusive'] - 1
+
+    # A vowel reference takes precedence over letters, as in the original parser
+    if 'vowel' in tokens:
+        required = [VOWELS[tokens['vowel'].group('ordinal')]]
+    if len(required) == 1:
+        filters['contains_character'] = required[0]
+    elif required:
+        filters['contains_characters'] = required
+    if excluded:
+        filters['excludes_characters'] = excluded
+
+    return filters
+
+
+_cached_parse = None
+
+
+def _parse_cache():
+    """
+    Return the memoized parser, built on first use.
+    
+    The cache is sized from ``STRINGS_NL_QUERY_CACHE_SIZE`` when it is built
+    rather than at import, and rebuilt (empty) if the setting changes.
+    """
+    global _cached_parse
+    size = settings.STRINGS_NL_QUERY_CACHE_SIZE
+    if _cached_parse is None or _cached_parse.cache_parameters()['maxsize'] != size:
+        _cached_parse = lru_cache(maxsize=size)(_parse_normalized)
+    return _cached_parse
+
+
+def parse_query(query):
+    """Parse a natural-language query into list filter parameters."""
+    # Copy, so callers cannot mutate the memoized result
+    return {
+        name: list(value) if isinstance(value, list) else value
+        for name, value in _parse_cache()(normalize_query(query)).items()
+    }
+
+
+def cache_info():
+    """Return hit/miss/size statistics of the parse cache."""
+    return _parse_cache().cache_info()
+
+
+def cache_clear():
+    _parse_cache().cache_clear()
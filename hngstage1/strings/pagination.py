@@ -0,0 +1,221 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.utils.urls import replace_query_param
+
+from .models import StringStatistic
+from .renderers import dumps
+from .serializers import Projection
+
+
+# Keyset order: newest first, ties broken by the content-addressed ID.
+KEYSET_ORDERING = ('-created_at', '-id')
+
+CURSOR_SALT = 'strings.pagination.cursor'
+
+STREAM_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+# (opening, separator, terminator, closing) bytes around streamed rows.
+STREAM_FRAMING = {
+    'ndjson': (b'', b'', b'\n', b''),
+    'json': (b'[', b',', b'', b']'),
+}
+
+
+class InvalidPageParameter(ValueError):
+    """Raised when limit, cursor, stream or query-mode parameters are invalid."""
+
+
+def encode_cursor(created_at, pk, count, generation):
+    """
+    Encode a keyset position, the result count and the write generation it
+    was counted at into a signed, opaque cursor token.
+    """
+    return signing.dumps([created_at.isoformat(), pk, count, generation], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor token back into its (created_at, id, count, generation).
+
+    Unsigned cursors issued by earlier releases still give a position, but
+    decode with a count and generation of None, so the count is taken again.
+    """
+    try:
+        created_at, pk, count, generation = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        try:
+            payload = base64.urlsafe_b64decode(cursor.encode('ascii'))
+            created_at, pk, *_ = json.loads(payload)
+        except (ValueError, TypeError, UnicodeError):
+            raise InvalidPageParameter("Invalid value for cursor.")
+        count = generation = None
+    except (ValueError, TypeError):
+        raise InvalidPageParameter("Invalid value for cursor.")
+    try:
+        return datetime.fromisoformat(created_at), str(pk), count, generation
+    except (ValueError, TypeError):
+        raise InvalidPageParameter("Invalid value for cursor.")
+
+
+def parse_flag(query_params, name):
+    """Parse an optional true/false query parameter, defaulting to False."""
+    value = query_params.get(name)
+    if value is None or value.lower() == 'false':
+        return False
+    if value.lower() == 'true':
+        return True
+    raise InvalidPageParameter(f"Invalid value for {name}. Use 'true' or 'false'.")
+
+
+def parse_limit(limit):
+    """Parse the limit query parameter, falling back to the default page size."""
+    if limit is None:
+        return settings.STRINGS_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise InvalidPageParameter("Invalid value for limit. Must be an integer.")
+    if limit < 1 or limit > settings.STRINGS_MAX_PAGE_SIZE:
+        raise InvalidPageParameter(
+            f"Invalid value for limit. Must be between 1 and {settings.STRINGS_MAX_PAGE_SIZE}."
+        )
+    return limit
+
+
+def _page_query(queryset, request, projection):
+    """
+    Return the row query of a page, its limit, the (count, generation)
+    carried by the cursor (None on the first page) and the query to count.
+    """
+    limit = parse_limit(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
+
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if not cursor:
+        return queryset.values_list(*projection.columns)[:limit + 1], limit, None, queryset
+    created_at, pk, count, generation = decode_cursor(cursor)
+    page = queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    )
+    return page.values_list(*projection.columns)[:limit + 1], limit, (count, generation), queryset
+
+
+def _first_page_count(rows, limit, carried):
+    """The total implied by a first page that fits entirely in ``rows``, else None."""
+    if carried is None and len(rows) <= limit:
+        return len(rows)
+    return None
+
+
+def _carried_count(carried, generation):
+    """The count carried by the cursor, if nothing was written since it was taken."""
+    if carried is not None and carried[1] == generation:
+        return carried[0]
+    return None
+
+
+def _page_result(rows, limit, count, generation, request, projection):
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # Projected rows always start with id and end with created_at
+        last = rows[-1]
+        next_url = replace_query_param(
+            request.build_absolute_uri(), 'cursor', encode_cursor(last[-1], last[0], count, generation)
+        )
+    return [projection.represent(row) for row in rows], count, next_url
+
+
+def paginate_queryset(queryset, request, projection=None):
+    """
+    Return one serialized keyset page of ``queryset``, the total number of
+    matching rows and the next page's URL.
+
+    Rows are ordered on (created_at, id) descending, so a page is a single
+    LIMIT range scan on that index that does not get slower the deeper the
+    client pages. Only the columns of ``projection`` (default: every field)
+    are read.
+
+    A first page holding every match is its own count; otherwise the page
+    runs one ``COUNT(*)``. The signed cursor carries the count with the write
+    generation it was taken at, and later pages reuse it until a write
+    changes the generation.
+    """
+    projection = projection or Projection()
+    page, limit, carried, uncounted = _page_query(queryset, request, projection)
+    rows = list(page)
+    count = _first_page_count(rows, limit, carried)
+    generation = None
+    if count is None:
+        # Read before counting: a write in between only costs a later recount
+        generation = StringStatistic.generation()
+        count = _carried_count(carried, generation)
+        if count is None:
+            count = uncounted.count()
+    return _page_result(rows, limit, count, generation, request, projection)
+
+
+async def apaginate_queryset(queryset, request, projection=None):
+    """Async variant of ``paginate_queryset``."""
+    projection = projection or Projection()
+    page, limit, carried, uncounted = _page_query(queryset, request, projection)
+    rows = [row async for row in page]
+    count = _first_page_count(rows, limit, carried)
+    generation = None
+    if count is None:
+        generation = await StringStatistic.ageneration()
+        count = _carried_count(carried, generation)
+        if count is None:
+            count = await uncounted.acount()
+    return _page_result(rows, limit, count, generation, request, projection)
+
+
+def stream_queryset(queryset, stream_format, projection=None, is_async=False):
+    """
+    Stream every row of ``queryset`` as NDJSON or as a chunked JSON array.
+
+    Rows are read with ``.iterator()`` (``.aiterator()`` for async views) and
+    serialized one at a time, so memory stays flat regardless of how many
+    rows match.
+    """
+    if stream_format not in STREAM_CONTENT_TYPES:
+        raise InvalidPageParameter("Invalid value for stream. Use 'ndjson' or 'json'.")
+
+    projection = projection or Projection()
+    rows = queryset.order_by(*KEYSET_ORDERING).values_list(*projection.columns)
+    chunk_size = settings.STRINGS_STREAM_CHUNK_SIZE
+
+    opening, between, terminator, closing = STREAM_FRAMING[stream_format]
+
+    def frame(row, separator):
+        return separator + dumps(projection.represent(row)) + terminator
+
+    if is_async:
+        async def content():
+            yield opening
+            separator = b''
+            # Named rows: plain values_list() runs its query in aiterator()
+            # on the event loop itself, which Django refuses
+            async for row in rows.values_list(*projection.columns, named=True).aiterator(chunk_size=chunk_size):
+                yield frame(row, separator)
+                separator = between
+            yield closing
+    else:
+        def content():
+            yield opening
+            separator = b''
+            for row in rows.iterator(chunk_size=chunk_size):
+                yield frame(row, separator)
+                separator = between
+            yield closing
+
+    return StreamingHttpResponse(content(), content_type=STREAM_CONTENT_TYPES[stream_format])
@@ -0,0 +1,40 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class InvalidItem:
+    """Placeholder for an NDJSON line that could not be decoded."""
+    
+    def __init__(self, error):
+        self.error = error
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse a newline-delimited JSON body into a list of items.
+    
+    A line that is not valid JSON becomes an ``InvalidItem`` instead of failing
+    the whole request, so batch callers get a per-item error for it.
+    """
+    
+    media_type = 'application/x-ndjson'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        try:
+            for line in stream:
+                line = line.decode(encoding).strip()
+                if not line:
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError as exc:
+                    items.append(InvalidItem(f"Invalid JSON: {exc}"))
+        except UnicodeDecodeError as exc:
+            raise ParseError(f"NDJSON parse error - {exc}")
+        return items
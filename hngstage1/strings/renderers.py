@@ -0,0 +1,68 @@
+"""
+JSON rendering for the strings API.
+
+``FastJSONRenderer`` encodes with orjson when it is installed and produces
+exactly the bytes DRF's ``JSONRenderer`` would; anything orjson would encode
+differently (datetimes, Decimals, non-string keys, ...) falls back to DRF.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from . import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class _Unsupported(TypeError):
+    pass
+
+
+def _default(obj):
+    # DRF's ReturnDict/ReturnList are plain containers as far as JSON goes
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, (list, tuple)):
+        return list(obj)
+    raise _Unsupported
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
+
+
+def dumps(data):
+    """Encode ``data`` compactly as UTF-8 JSON, identical to ``JSONRenderer``."""
+    with metrics.timed('serialization'):
+        return _dumps(data)
+
+
+def _dumps(data):
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, _Unsupported):
+            pass
+        else:
+            # Escape the JavaScript line terminators, as JSONRenderer does
+            return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return JSONRenderer().render(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that takes the orjson path for compact output."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            with metrics.timed('serialization'):
+                return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -1,7 +1,135 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import AnalyzedString
 
 
+# Columns read by the lean serialization path, in row-tuple order.
+ROW_FIELDS = (
+    'id', 'value', 'length', 'is_palindrome', 'unique_characters',
+    'word_count', 'character_frequency_map', 'created_at'
+)
+
+
+def format_datetime(value):
+    """Format a datetime exactly as DRF's default DateTimeField does."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def represent_row(row):
+    """Build the AnalyzedStringSerializer representation of a ROW_FIELDS tuple."""
+    (pk, value, length, is_palindrome, unique_characters,
+     word_count, character_frequency_map, created_at) = row
+    return {
+        'id': pk,
+        'value': value,
+        'properties': {
+            'length': length,
+            'is_palindrome': is_palindrome,
+            'unique_characters': unique_characters,
+            'word_count': word_count,
+            'sha256_hash': pk,
+            'character_frequency_map': character_frequency_map
+        },
+        'created_at': format_datetime(created_at)
+    }
+
+
+def represent_instance(obj):
+    """Build the AnalyzedStringSerializer representation of a model instance."""
+    return represent_row(tuple(getattr(obj, field) for field in ROW_FIELDS))
+
+
+def serialize_queryset(queryset):
+    """
+    Serialize ``queryset`` from plain row tuples, skipping model instantiation
+    and DRF's per-field pipeline. Output matches AnalyzedStringSerializer.
+    """
+    return [represent_row(row) for row in queryset.values_list(*ROW_FIELDS)]
+
+
+# Names accepted by the fields= and exclude= list parameters.
+PROPERTY_FIELDS = (
+    'length', 'is_palindrome', 'unique_characters', 'word_count',
+    'sha256_hash', 'character_frequency_map'
+)
+PROJECTABLE_FIELDS = ('id', 'value', 'properties', 'created_at') + PROPERTY_FIELDS
+
+# The column each property is read from; sha256_hash is the primary key.
+PROPERTY_COLUMNS = {name: name for name in PROPERTY_FIELDS}
+PROPERTY_COLUMNS['sha256_hash'] = 'id'
+
+
+class InvalidProjection(ValueError):
+    """Raised when fields or exclude name an unknown field."""
+
+
+class Projection:
+    """
+    The subset of the representation a list response carries.
+    
+    Fields are named as in the response: ``id``, ``value``, ``created_at``,
+    ``properties`` (all of them) or a single property such as ``length``.
+    Only the columns backing the selected fields are read, plus ``id`` and
+    ``created_at`` which the keyset cursor always needs.
+    """
+    
+    def __init__(self, fields=None, exclude=()):
+        fields = set(PROJECTABLE_FIELDS if fields is None else fields)
+        exclude = set(exclude)
+        unknown = (fields | exclude) - set(PROJECTABLE_FIELDS)
+        if unknown:
+            raise InvalidProjection(
+                f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                f"Valid fields are: {', '.join(PROJECTABLE_FIELDS)}."
+            )
+        for names in (fields, exclude):
+            if 'properties' in names:
+                names.update(PROPERTY_FIELDS)
+        selected = fields - exclude
+        
+        self.fields = [name for name in ('id', 'value', 'created_at') if name in selected]
+        self.properties = [name for name in PROPERTY_FIELDS if name in selected]
+        self.is_full = len(self.fields) + len(self.properties) == len(PROJECTABLE_FIELDS) - 1
+        needed = {'id', 'created_at'} | set(self.fields)
+        needed.update(PROPERTY_COLUMNS[name] for name in self.properties)
+        # Always a ROW_FIELDS-ordered subset: id first, created_at last
+        self.columns = tuple(column for column in ROW_FIELDS if column in needed)
+    
+    @classmethod
+    def from_query_params(cls, query_params):
+        """Build a projection from comma-separated fields/exclude parameters."""
+        def names(param):
+            raw = query_params.get(param)
+            if raw is None:
+                return None
+            parsed = [name.strip() for name in raw.split(',') if name.strip()]
+            if not parsed:
+                raise InvalidProjection(f"Invalid value for {param}. Must list at least one field.")
+            return parsed
+        return cls(names('fields'), names('exclude') or ())
+    
+    def represent(self, row):
+        """Build the projected representation of a ``self.columns`` tuple."""
+        if self.is_full:
+            return represent_row(row)
+        values = dict(zip(self.columns, row))
+        item = {}
+        if 'id' in self.fields:
+            item['id'] = values['id']
+        if 'value' in self.fields:
+            item['value'] = values['value']
+        if self.properties:
+            item['properties'] = {name: values[PROPERTY_COLUMNS[name]] for name in self.properties}
+        if 'created_at' in self.fields:
+            item['created_at'] = format_datetime(values['created_at'])
+        return item
+
+
 class AnalyzedStringSerializer(serializers.ModelSerializer):
     """Serializer for AnalyzedString model."""
     
@@ -19,7 +147,7 @@ class AnalyzedStringSerializer(serializers.ModelSerializer):
             'is_palindrome': obj.is_palindrome,
             'unique_characters': obj.unique_characters,
             'word_count': obj.word_count,
-            'sha256_hash': obj.sha256_hash,
+            'sha256_hash': obj.id,
             'character_frequency_map': obj.character_frequency_map
         }
     
@@ -0,0 +1,166 @@
+"""
+Incremental analysis of request bodies that are too large to hold several times.
+
+The body is read in chunks into a spooled temporary file while an
+``IncrementalAnalyzer`` hashes it, counts characters and words across chunk
+boundaries, and the palindrome check then compares the file from both ends.
+Only the final ``value`` handed to the database is ever materialized in full.
+"""
+
+from collections import Counter
+import codecs
+import hashlib
+
+from .analysis import WORD_RE
+
+
+# str.lower() maps capital sigma by context (final vs. medial form), so
+# strings containing it cannot be lowered chunk by chunk.
+CONTEXT_SENSITIVE_CHARACTERS = frozenset('Σ')
+
+
+class BodyTooLarge(ValueError):
+    """Raised when a streamed body exceeds the configured size limit."""
+
+
+def iter_file_chunks(fileobj, chunk_size):
+    """Yield decoded text from the start of a UTF-8 file, one chunk at a time."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    position = 0
+    while True:
+        # Seek every time: the reversed reader may share this file object
+        fileobj.seek(position)
+        data = fileobj.read(chunk_size)
+        if not data:
+            break
+        position += len(data)
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_file_chunks_reversed(fileobj, size, chunk_size):
+    """Yield decoded text blocks from a UTF-8 file, last block first."""
+    position = size
+    carry = b''
+    while position > 0:
+        start = max(0, position - chunk_size)
+        fileobj.seek(start)
+        data = fileobj.read(position - start) + carry
+        # Leading continuation bytes belong to a character that starts in the
+        # previous block; hold them back until that block is read.
+        split = 0
+        if start > 0:
+            while split < len(data) and data[split] & 0xC0 == 0x80:
+                split += 1
+        carry, data = data[:split], data[split:]
+        position = start
+        yield data.decode('utf-8')
+
+
+def is_palindrome_file(fileobj, size, normalized_length, chunk_size):
+    """
+    Case-insensitively check whether a UTF-8 file reads the same both ways.
+
+    Lowered text from the front is compared with reversed lowered text from
+    the back until the two meet, holding at most a few chunks in memory.
+    """
+    remaining = normalized_length // 2
+    forward = (text.lower() for text in iter_file_chunks(fileobj, chunk_size))
+    backward = (text.lower()[::-1] for text in iter_file_chunks_reversed(fileobj, size, chunk_size))
+    front = back = ''
+    while remaining > 0:
+        while len(front) < min(remaining, chunk_size):
+            front += next(forward)
+        while len(back) < min(remaining, chunk_size):
+            back += next(backward)
+        step = min(len(front), len(back), remaining)
+        if front[:step] != back[:step]:
+            return False
+        front, back = front[step:], back[step:]
+        remaining -= step
+    return True
+
+
+class IncrementalAnalyzer:
+    """
+    Compute the same properties as ``compute_properties`` from UTF-8 chunks.
+
+    Raises ``UnicodeDecodeError`` if the data is not valid UTF-8.
+    """
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._counts = Counter()
+        self._in_word = False
+        self.length = 0
+        self.normalized_length = 0
+        self.word_count = 0
+        self.size = 0
+
+    def update(self, data):
+        self._sha256.update(data)
+        self.size += len(data)
+        self._feed(self._decoder.decode(data))
+
+    def _feed(self, text):
+        if not text:
+            return
+        self._counts.update(text)
+        self.length += len(text)
+        self.normalized_length += len(text.lower())
+        words = sum(1 for _ in WORD_RE.finditer(text))
+        if self._in_word and not text[0].isspace():
+            # The first word continues one from the previous chunk
+            words -= 1
+        self.word_count += words
+        self._in_word = not text[-1].isspace()
+
+    def finish(self, fileobj, chunk_size):
+        """Return the properties, re-reading ``fileobj`` for the palindrome check."""
+        self._feed(self._decoder.decode(b'', final=True))
+        character_frequency_map = dict(self._counts)
+        if CONTEXT_SENSITIVE_CHARACTERS.isdisjoint(character_frequency_map):
+            is_palindrome = is_palindrome_file(fileobj, self.size, self.normalized_length, chunk_size)
+        else:
+            normalized = read_text(fileobj, chunk_size).lower()
+            is_palindrome = normalized == normalized[::-1]
+        sha256_hash = self._sha256.hexdigest()
+        return {
+            'id': sha256_hash,
+            'length': self.length,
+            'is_palindrome': is_palindrome,
+            'unique_characters': len(character_frequency_map),
+            'word_count': self.word_count,
+            'sha256_hash': sha256_hash,
+            'character_frequency_map': character_frequency_map
+        }
+
+
+def read_text(fileobj, chunk_size):
+    """Read the whole UTF-8 file back as a single string."""
+    return ''.join(iter_file_chunks(fileobj, chunk_size))
+
+
+def analyze_stream(stream, chunk_size, max_bytes, spool=None):
+    """
+    Analyze a binary stream chunk by chunk and return (properties, file).
+
+    A non-seekable request body is copied into ``spool`` as it is read, so it
+    can be re-read for the palindrome check and the stored value; a seekable
+    file (such as an upload Django has already spooled) is re-read in place.
+    """
+    analyzer = IncrementalAnalyzer()
+    source = stream if spool is None else spool
+    if spool is None:
+        stream.seek(0)
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        if analyzer.size + len(data) > max_bytes:
+            raise BodyTooLarge(f"Body exceeds the maximum of {max_bytes} bytes.")
+        analyzer.update(data)
+        if spool is not None:
+            spool.write(data)
+    return analyzer.finish(source, chunk_size), source
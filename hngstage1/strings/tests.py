@@ -1,3 +1,1279 @@
-from django.test import TestCase
+import base64
+import hashlib
+import gzip
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import unittest
+import unittest.mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.conf import settings
+from django.core import signing
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.urls import include, path
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from benchmarks.reference import load_query_corpus, reference_compute_properties, reference_parse_natural_language_query
+
+from . import cache, metrics, renderers
+from .analysis import hash_value
+from .filters import filter_strings
+from .ingest import bulk_create_strings, existing_ids, ingest_items
+from .models import AnalyzedString, StringCharacter, case_variants
+from .nlquery import cache_clear, cache_info, parse_query
+from .pagination import KEYSET_ORDERING, _page_query
+from .serializers import AnalyzedStringSerializer, Projection, represent_instance, serialize_queryset
+
+
+# Lets AsyncViewTests route /strings to the async views via ROOT_URLCONF.
+urlpatterns = [path('strings', include('strings.async_urls'))]
+
+
+class StringsTestCase(TestCase):
+    """Starts every test with an empty response cache."""
+
+    def setUp(self):
+        super().setUp()
+        cache.get_cache().clear()
+        cache.reset_stats()
+
+
+# Filter combinations accepted by the list and natural-language endpoints.
+FILTER_INDEX_PLANS = [
+    {},
+    {'is_palindrome': True},
+    {'is_palindrome': False},
+    {'word_count': 2},
+    {'min_length': 3},
+    {'min_length': 3, 'max_length': 9},
+    {'is_palindrome': True, 'word_count': 1},
+    {'is_palindrome': True, 'min_length': 3},
+    {'is_palindrome': False, 'max_length': 10},
+    {'word_count': 1, 'min_length': 3},
+    {'min_word_count': 2, 'max_word_count': 4},
+    {'is_palindrome': True, 'word_count': 1, 'min_length': 3, 'max_length': 5},
+]
+
+
+class StringListPaginationTests(StringsTestCase):
+    """Keyset pagination and streaming on GET /strings."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.values = [f"value {i}" for i in range(7)]
+        for value in self.values:
+            AnalyzedString.objects.create(value=value)
+
+    @override_settings(STRINGS_PAGE_SIZE=3)
+    def test_cursor_walks_every_row_once(self):
+        seen = []
+        url = '/strings'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 7)
+            self.assertLessEqual(len(response.data['data']), 3)
+            seen.extend(item['value'] for item in response.data['data'])
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(self.values))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_limit_and_cursor_are_validated(self):
+        self.assertEqual(self.client.get('/strings?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/strings?limit=abc').status_code, 400)
+        self.assertEqual(self.client.get('/strings?cursor=not-a-cursor').status_code, 400)
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/strings?stream=ndjson&word_count=2')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)['value'] for line in lines), sorted(self.values))
+
+    def test_json_array_stream(self):
+        response = self.client.get('/strings?stream=json')
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(body), 7)
+        self.assertIn('properties', body[0])
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN output is SQLite-specific')
+class FilterIndexPlanTests(StringsTestCase):
+    """Every documented filter combination must be served by an index."""
+
+    # Keyset-ordered indexes, with the filter every row in them satisfies
+    ORDERED_INDEXES = {
+        'strings_created_idx': {},
+        'strings_pal_created_idx': {'is_palindrome': True},
+    }
+
+    # An ordered scan may read at most this many index rows per row of a
+    # page: either matches are dense or the (partial) index is small
+    MAX_SCAN_READS_PER_ROW = 4
+    PAGE = 101
+
+    @classmethod
+    def setUpTestData(cls):
+        # Plans on an empty table prove nothing: seed a realistic mix and ANALYZE
+        rng = random.Random(0)
+        words = ['alpha', 'level', 'kayak', 'hello', 'two', 'words', 'noon', 'x', 'strings', 'query']
+
+        def phrase(count):
+            return ' '.join(f"{rng.choice(words)}{rng.randrange(100)}" for _ in range(count))
+
+        values = set()
+        while len(values) < 2000:
+            if rng.random() < 0.05:
+                half = phrase(rng.randint(1, 3))
+                values.add(half + half[::-1])
+            else:
+                values.add(phrase(min(40, max(1, round(rng.lognormvariate(1.5, 0.8))))))
+        bulk_create_strings([AnalyzedString.from_value(value) for value in values])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assert_index_served(self, queryset, filters):
+        """Each step on the strings table is an index search, or a dense ordered index scan."""
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if re.search(r'\banalyzed_strings\b', line)]
+        self.assertTrue(steps, plan)
+        for line in steps:
+            if re.search(r'SEARCH analyzed_strings USING (COVERING )?INDEX \w+ \(', line):
+                continue
+            scan = re.search(r'SCAN analyzed_strings USING INDEX (\w+)$', line)
+            self.assertTrue(scan and scan.group(1) in self.ORDERED_INDEXES, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+            scanned = filter_strings(self.ORDERED_INDEXES[scan.group(1)]).count()
+            matches = filter_strings(filters).count()
+            reads = scanned if matches < self.PAGE else self.PAGE * scanned / matches
+            self.assertLessEqual(reads, self.MAX_SCAN_READS_PER_ROW * self.PAGE, plan)
+
+    def test_filter_combinations_use_an_index(self):
+        for filters in FILTER_INDEX_PLANS:
+            with self.subTest(filters=filters):
+                self.assert_index_served(filter_strings(filters).order_by(*KEYSET_ORDERING)[:self.PAGE], filters)
+
+    def test_first_page_is_a_limit_scan_of_the_keyset_index(self):
+        request = RequestFactory().get('/strings')
+        page = _page_query(AnalyzedString.objects.all(), request, Projection())[0]
+        plan = page.explain()
+        self.assertIn('SCAN analyzed_strings USING INDEX strings_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        for filters in FILTER_INDEX_PLANS:
+            with self.subTest(filters=filters):
+                self.assert_index_served(_page_query(filter_strings(filters), request, Projection())[0], filters)
+
+    def test_contains_character_uses_character_index(self):
+        for filters in [{'contains_character': 'q'}, {'contains_character': 'q', 'is_palindrome': True}]:
+            with self.subTest(filters=filters):
+                queryset = filter_strings(filters).order_by(*KEYSET_ORDERING)[:self.PAGE]
+                self.assertIn('(character=?)', queryset.explain())
+                self.assert_index_served(queryset, filters)
+
+
+class ContainsCharacterTests(StringsTestCase):
+    """contains_character lookups through the StringCharacter index."""
+
+    def setUp(self):
+        super().setUp()
+        for value in ['Apple pie', 'banana', 'Ärger', 'xyz']:
+            AnalyzedString.objects.create(value=value)
+
+    def values_containing(self, char):
+        return sorted(AnalyzedString.objects.containing_character(char).values_list('value', flat=True))
+
+    def test_lookup_is_case_insensitive(self):
+        self.assertEqual(self.values_containing('a'), ['Apple pie', 'banana'])
+        self.assertEqual(self.values_containing('P'), ['Apple pie'])
+        self.assertEqual(self.values_containing('ä'), ['Ärger'])
+        self.assertEqual(self.values_containing('q'), [])
+
+    def test_index_rows_are_removed_with_the_string(self):
+        AnalyzedString.objects.get(value='banana').delete()
+        self.assertEqual(self.values_containing('n'), [])
+
+
+class StringBatchTests(StringsTestCase):
+    """POST /strings/batch with JSON and NDJSON bodies."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        AnalyzedString.objects.create(value='existing')
+
+    def test_json_array_reports_status_per_item(self):
+        response = self.client.post(
+            '/strings/batch', ['racecar', 'existing', 42, {'value': 'two words'}, 'racecar'], format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'conflict', 'invalid', 'created', 'conflict'])
+        self.assertEqual((response.data['created'], response.data['conflicts'], response.data['invalid']), (2, 2, 1))
+        created = AnalyzedString.objects.get(value='two words')
+        self.assertEqual(created.word_count, 2)
+        self.assertEqual(list(AnalyzedString.objects.containing_character('w').values_list('value', flat=True)), ['two words'])
+
+    def test_ndjson_body(self):
+        body = '"alpha"\n{"value": "beta"}\nnot json\n\n"existing"\n'
+        response = self.client.post('/strings/batch', body, content_type='application/x-ndjson')
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'created', 'invalid', 'conflict'])
+        self.assertTrue(AnalyzedString.objects.filter(value='beta').exists())
+
+    @override_settings(STRINGS_BATCH_MAX_ITEMS=2)
+    def test_batch_size_limit(self):
+        response = self.client.post('/strings/batch', ['a', 'b', 'c'], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_body_must_be_a_list(self):
+        response = self.client.post('/strings/batch', {'value': 'a'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ComputePropertiesEquivalenceTests(unittest.TestCase):
+    """compute_properties must be output-identical to the reference analysis."""
+
+    ALPHABET = 'aAbBzZ \t\n\x1c\u00a0\u2003İıΣσςßé😀.,'
+
+    def assert_equivalent(self, value):
+        expected = reference_compute_properties(value)
+        actual = AnalyzedString.compute_properties(value)
+        self.assertEqual(actual, expected, repr(value))
+        # JSON output depends on key order too
+        self.assertEqual(
+            list(actual['character_frequency_map']), list(expected['character_frequency_map'])
+        )
+
+    def test_edge_cases(self):
+        for value in ['', ' ', 'a', 'Aa', 'abA', 'racecar', 'Race car', 'ΣAΣ', 'İi', '  two  words  ']:
+            self.assert_equivalent(value)
+
+    def test_random_strings(self):
+        rng = random.Random(20251020)
+        for _ in range(2000):
+            length = rng.choice([rng.randint(0, 8), rng.randint(0, 200)])
+            value = ''.join(rng.choice(self.ALPHABET) for _ in range(length))
+            if rng.random() < 0.3:
+                value = value + value[::-1][rng.randint(0, 1):]
+            self.assert_equivalent(value)
+
+
+class AnalysisExecutorTests(StringsTestCase):
+    """Analysis backends must all produce the same properties."""
+
+    VALUES = ['racecar', 'two words', 'Ünïcödé 😀', '']
+
+    def test_backends_agree(self):
+        from .executor import analyze, analyze_many
+        expected = [reference_compute_properties(value) for value in self.VALUES]
+        for backend in ['inline', 'thread', 'process']:
+            with self.subTest(backend=backend), override_settings(
+                STRINGS_ANALYSIS_BACKEND=backend, STRINGS_ANALYSIS_OFFLOAD_THRESHOLD=0
+            ):
+                self.assertEqual(analyze_many(self.VALUES), expected)
+                self.assertEqual(analyze('racecar'), expected[0])
+
+    @override_settings(STRINGS_ANALYSIS_BACKEND='process', STRINGS_ANALYSIS_OFFLOAD_THRESHOLD=0)
+    def test_batch_ingest_on_process_pool(self):
+        response = APIClient().post('/strings/batch', ['abc', 'abc', 'level'], format='json')
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'conflict', 'created'])
+        self.assertTrue(AnalyzedString.objects.get(value='level').is_palindrome)
+
+
+class StreamingUploadTests(StringsTestCase):
+    """Chunked analysis must match compute_properties exactly."""
+
+    VALUES = [
+        '', 'a', 'Racecar', 'never odd or even', 'Was it a car or a cat I saw',
+        'İstanbul lubnatsİ', 'ΣAΣ', 'σας', 'ab cd  ef\n', '😀éé😀', 'not a palindrome 😀',
+        'Ünïcödé ' * 40 + 'x',
+    ]
+
+    def analyze(self, value, chunk_size):
+        from io import BytesIO
+        from .streaming import analyze_stream
+        properties, _ = analyze_stream(BytesIO(value.encode('utf-8')), chunk_size, 10 ** 6)
+        return properties
+
+    def test_matches_compute_properties_at_every_chunk_size(self):
+        for value in self.VALUES:
+            expected = reference_compute_properties(value)
+            for chunk_size in [4, 5, 7, 64, 4096]:
+                with self.subTest(value=value, chunk_size=chunk_size):
+                    properties = self.analyze(value, chunk_size)
+                    self.assertEqual(properties, expected)
+                    self.assertEqual(list(properties['character_frequency_map']), list(expected['character_frequency_map']))
+
+    def test_random_palindromes(self):
+        rng = random.Random(7)
+        alphabet = 'aAbß😀İ é'
+        for _ in range(300):
+            half = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            value = half + rng.choice(['', 'x', 'É']) + half[::-1].swapcase()
+            self.assertEqual(self.analyze(value, rng.randint(4, 16)), reference_compute_properties(value), repr(value))
+
+    @override_settings(STRINGS_UPLOAD_CHUNK_SIZE=8)
+    def test_text_plain_upload(self):
+        client = APIClient()
+        response = client.post('/strings/upload', 'A man a plan a canal Panama'.replace(' ', ''), content_type='text/plain')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['properties']['is_palindrome'])
+        self.assertEqual(AnalyzedString.objects.get(pk=response.data['id']).value, 'AmanaplanacanalPanama')
+        response = client.post('/strings/upload', 'AmanaplanacanalPanama', content_type='text/plain')
+        self.assertEqual(response.status_code, 409)
+
+    def test_multipart_upload(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('value.txt', 'two words'.encode('utf-8'))
+        response = APIClient().post('/strings/upload', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['properties']['word_count'], 2)
+
+    def test_rejects_invalid_utf8_and_oversized_bodies(self):
+        client = APIClient()
+        response = client.post('/strings/upload', b'\xff\xfe', content_type='text/plain')
+        self.assertEqual(response.status_code, 400)
+        with override_settings(STRINGS_UPLOAD_MAX_BYTES=4):
+            response = client.post('/strings/upload', 'too long', content_type='text/plain')
+        self.assertEqual(response.status_code, 413)
+        response = client.post('/strings/upload', {'value': 'x'}, format='json')
+        self.assertEqual(response.status_code, 415)
+
+
+class HashIdentityTests(StringsTestCase):
+    """Identity is the SHA-256 primary key; sha256_hash is an alias of it."""
+
+    def test_sha256_hash_alias_and_duplicate_detection(self):
+        client = APIClient()
+        response = client.post('/strings', {'value': 'hello'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['properties']['sha256_hash'], response.data['id'])
+        self.assertEqual(response.data['id'], hashlib.sha256(b'hello').hexdigest())
+        self.assertEqual(client.post('/strings', {'value': 'hello'}, format='json').status_code, 409)
+        self.assertEqual(client.get('/strings/hello').data['id'], response.data['id'])
+
+
+class StringDetailTests(StringsTestCase):
+    """Detail lookups go through the SHA-256 primary key."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.string = AnalyzedString.objects.create(value='hello world')
+
+    def test_get_by_value_and_by_id(self):
+        self.assertEqual(self.client.get('/strings/hello world').data['value'], 'hello world')
+        response = self.client.get(f'/strings/by-id/{self.string.id.upper()}')
+        self.assertEqual(response.data['value'], 'hello world')
+        self.assertEqual(self.client.get(f'/strings/by-id/{"0" * 64}').status_code, 404)
+
+    def test_delete_404s_when_missing(self):
+        self.assertEqual(self.client.delete('/strings/hello world').status_code, 204)
+        self.assertFalse(AnalyzedString.objects.exists())
+        self.assertEqual(self.client.delete('/strings/hello world').status_code, 404)
+
+    def test_delete_by_id(self):
+        self.assertEqual(self.client.delete(f'/strings/by-id/{self.string.id}').status_code, 204)
+        self.assertEqual(self.client.delete(f'/strings/by-id/{self.string.id}').status_code, 404)
+
+    def test_values_named_like_endpoints(self):
+        for value in ['batch', 'upload', 'stats']:
+            self.client.post('/strings', {'value': value}, format='json')
+        self.assertEqual(self.client.get('/strings/batch').data['value'], 'batch')
+        self.assertEqual(self.client.get('/strings/upload').data['value'], 'upload')
+        for value in ['batch', 'upload']:
+            self.assertEqual(self.client.delete(f'/strings/{value}').status_code, 204, value)
+            self.assertEqual(self.client.delete(f'/strings/{value}').status_code, 404, value)
+        # The statistics endpoints are reserved; those strings are reached by ID
+        self.assertIn('total', self.client.get('/strings/stats').data)
+        self.assertEqual(self.client.delete('/strings/stats').status_code, 405)
+        stats_id = hash_value('stats')
+        self.assertEqual(self.client.get(f'/strings/by-id/{stats_id}').data['value'], 'stats')
+        self.assertEqual(self.client.delete(f'/strings/by-id/{stats_id}').status_code, 204)
+        self.assertEqual(AnalyzedString.objects.get().value, 'hello world')
+
+
+class BulkDeleteTests(StringsTestCase):
+    """DELETE /strings removes the matching strings in bounded batches."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.post('/strings/batch', ['level', 'noon', 'kayak', 'hello', 'two words'], format='json')
+
+    @override_settings(STRINGS_DELETE_BATCH_SIZE=2)
+    def test_deletes_matching_strings_in_batches(self):
+        self.assertEqual(self.client.get('/strings/noon').status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete('/strings?is_palindrome=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'deleted': 3, 'filters_applied': {'is_palindrome': True}})
+        table = AnalyzedString._meta.db_table
+        self.assertEqual(sum(query['sql'].startswith(f'DELETE FROM "{table}"') for query in queries), 2)
+        self.assertEqual(sorted(AnalyzedString.objects.values_list('value', flat=True)), ['hello', 'two words'])
+        self.assertEqual(self.client.get('/strings/noon').status_code, 404)
+        stats = self.client.get('/strings/stats').json()
+        self.assertEqual((stats['total'], stats['palindromes']), (2, {'true': 0, 'false': 2}))
+
+    def test_created_before(self):
+        AnalyzedString.objects.filter(value='hello').update(created_at='2020-01-01T00:00:00Z')
+        response = self.client.delete('/strings?created_before=2021-01-01')
+        self.assertEqual(response.json()['deleted'], 1)
+        self.assertEqual(response.json()['filters_applied'], {'created_before': '2021-01-01T00:00:00Z'})
+        self.assertEqual(self.client.delete('/strings?created_before=2021-01-01').json()['deleted'], 0)
+        self.assertEqual(self.client.delete('/strings?created_before=yesterday').status_code, 400)
+
+    def test_requires_a_filter_or_all(self):
+        response = self.client.delete('/strings')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AnalyzedString.objects.count(), 5)
+        self.assertEqual(self.client.delete('/strings?all=maybe').status_code, 400)
+        self.assertEqual(self.client.delete('/strings?all=true').data['deleted'], 5)
+        self.assertEqual(self.client.get('/strings').data['count'], 0)
+
+    def test_async_view(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = async_to_sync(self.async_client.delete)('/strings?word_count=2&contains_character=w')
+        self.assertEqual(response.json(), {'deleted': 1, 'filters_applied': {'word_count': 2, 'contains_character': 'w'}})
+        self.assertEqual(AnalyzedString.objects.count(), 4)
+
+
+class LeanSerializationTests(StringsTestCase):
+    """The values()-based serializer must render the same bytes as DRF."""
+
+    VALUES = [
+        '', 'level', 'hello world', 'Ünïcödé 😀 and 中文', 'quote " backslash \\ slash /',
+        'controls \x00\x01\x1f\x7f tab\tnew\nline', 'separators \u2028 \u2029', '\ud7ff\ue000\ufeff',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for value in self.VALUES:
+            AnalyzedString.objects.create(value=value)
+
+    def assertRendersLikeDRF(self, data, expected):
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_queryset_and_instances_match_drf(self):
+        queryset = AnalyzedString.objects.order_by(*KEYSET_ORDERING)
+        expected = AnalyzedStringSerializer(queryset, many=True).data
+        self.assertRendersLikeDRF(serialize_queryset(queryset), expected)
+        for obj in queryset:
+            self.assertRendersLikeDRF(represent_instance(obj), AnalyzedStringSerializer(obj).data)
+
+    def test_without_orjson(self):
+        queryset = AnalyzedString.objects.order_by(*KEYSET_ORDERING)
+        with unittest.mock.patch.object(renderers, 'orjson', None):
+            self.assertRendersLikeDRF(serialize_queryset(queryset), AnalyzedStringSerializer(queryset, many=True).data)
+
+    def test_unsupported_types_fall_back_to_drf(self):
+        data = {'created_at': AnalyzedString.objects.first().created_at, 1: 'non-string key'}
+        self.assertRendersLikeDRF(data, data)
+
+    def test_list_response_body(self):
+        response = self.client.get('/strings?limit=1000')
+        queryset = AnalyzedString.objects.order_by(*KEYSET_ORDERING)
+        self.assertEqual(json.loads(response.content)['data'], json.loads(
+            JSONRenderer().render(AnalyzedStringSerializer(queryset, many=True).data)
+        ))
+
+
+class FieldProjectionTests(StringsTestCase):
+    """fields= and exclude= on the list and natural-language endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for value in ['level', 'two words', 'noon', 'hello']:
+            AnalyzedString.objects.create(value=value)
+
+    def test_fields_select_top_level_and_property_fields(self):
+        item = self.client.get('/strings?fields=value,length,sha256_hash').data['data'][0]
+        self.assertEqual(list(item), ['value', 'properties'])
+        self.assertEqual(list(item['properties']), ['length', 'sha256_hash'])
+        self.assertEqual(item['properties']['sha256_hash'], hash_value(item['value']))
+
+    def test_exclude_skips_the_frequency_map_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/strings?exclude=character_frequency_map,created_at')
+        item = response.data['data'][0]
+        self.assertEqual(list(item), ['id', 'value', 'properties'])
+        self.assertNotIn('character_frequency_map', item['properties'])
+        self.assertFalse(any('character_frequency_map' in query['sql'] for query in queries))
+
+    def test_exclude_properties(self):
+        item = self.client.get('/strings?exclude=properties').data['data'][0]
+        self.assertEqual(list(item), ['id', 'value', 'created_at'])
+
+    @override_settings(STRINGS_PAGE_SIZE=1)
+    def test_cursor_works_without_id_or_created_at(self):
+        seen = []
+        url = '/strings?fields=value'
+        while url:
+            response = self.client.get(url)
+            seen.extend(item['value'] for item in response.data['data'])
+            url = response.data['next']
+        self.assertEqual(sorted(seen), ['hello', 'level', 'noon', 'two words'])
+
+    def test_stream_and_natural_language_endpoint(self):
+        response = self.client.get('/strings?stream=ndjson&fields=id')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(list(json.loads(lines[0])), ['id'])
+        response = self.client.get('/strings/filter-by-natural-language?query=palindromic&fields=value')
+        self.assertEqual(sorted(item['value'] for item in response.data['data']), ['level', 'noon'])
+        self.assertEqual(list(response.data['data'][0]), ['value'])
+
+    def test_unknown_or_empty_fields_are_rejected(self):
+        self.assertEqual(self.client.get('/strings?fields=value,bogus').status_code, 400)
+        self.assertEqual(self.client.get('/strings?fields=').status_code, 400)
+        response = self.client.get('/strings/filter-by-natural-language?query=palindromic&exclude=nope')
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryModeTests(StringsTestCase):
+    """count_only, exists and HEAD on the filter endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for value in ['level', 'noon', 'two words', 'hello', 'a b c']:
+            AnalyzedString.objects.create(value=value)
+
+    def test_count_only_and_exists(self):
+        response = self.client.get('/strings?is_palindrome=true&count_only=true')
+        self.assertEqual(response.data, {'count': 2, 'filters_applied': {'is_palindrome': True}})
+        self.assertEqual(response['X-Total-Count'], '2')
+        response = self.client.get('/strings?word_count=3&exists=true')
+        self.assertEqual(response.data, {'exists': True, 'filters_applied': {'word_count': 3}})
+        self.assertFalse(self.client.get('/strings?word_count=9&exists=true').data['exists'])
+        response = self.client.get('/strings/filter-by-natural-language?query=palindromic&count_only=true')
+        self.assertEqual(response.data['count'], 2)
+        self.assertNotIn('data', response.data)
+
+    def test_head_returns_the_count_only(self):
+        response = self.client.head('/strings?is_palindrome=false')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Total-Count'], '3')
+        self.assertEqual(response.content, b'')
+        # HEAD must not fill the cache entry of the equivalent GET
+        self.assertEqual(len(self.client.get('/strings?is_palindrome=false').data['data']), 3)
+        response = self.client.head('/strings/filter-by-natural-language?query=palindromic')
+        self.assertEqual(response['X-Total-Count'], '2')
+
+    def test_invalid_flags(self):
+        self.assertEqual(self.client.get('/strings?count_only=yes').status_code, 400)
+        self.assertEqual(self.client.get('/strings?exists=1').status_code, 400)
+
+    @override_settings(STRINGS_PAGE_SIZE=2)
+    def test_only_a_partial_first_page_counts(self):
+        # Every list request also reads the write generation for its cache key;
+        # the first page reads it again to tag its COUNT(*) in the cursor
+        url = '/strings'
+        expected_queries = 4
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(len(queries), expected_queries)
+            self.assertEqual(response.data['count'], 5)
+            url = response.data['next']
+            # Later pages check the generation and reuse the cursor's count
+            expected_queries = 3
+        # A first page holding every match is its own count
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/strings?is_palindrome=true').data['count'], 2)
+        self.assertEqual(self.client.get('/strings?word_count=9').data['count'], 0)
+
+    @override_settings(STRINGS_PAGE_SIZE=2)
+    def test_cursor_count_is_retaken_after_a_write(self):
+        next_url = self.client.get('/strings').data['next']
+        AnalyzedString.objects.filter(is_palindrome=False).delete()
+        self.assertEqual(self.client.get(next_url).data['count'], 2)
+
+    def test_cursor_count_cannot_be_edited(self):
+        next_url = self.client.get('/strings?limit=2').data['next']
+        cursor = parse_qs(urlsplit(next_url).query)['cursor'][0]
+        payload, signature = cursor.split(':', 1)
+        forged = signing.b64_encode(json.dumps(
+            json.loads(signing.b64_decode(payload.encode()))[:2] + [1000, 0]
+        ).encode()).decode()
+        response = self.client.get('/strings', {'limit': 2, 'cursor': f'{forged}:{signature}'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unsigned_cursors_are_recounted(self):
+        last = AnalyzedString.objects.order_by(*KEYSET_ORDERING).first()
+        legacy = base64.urlsafe_b64encode(
+            json.dumps([last.created_at.isoformat(), last.id, 1000]).encode()
+        ).decode()
+        response = self.client.get('/strings', {'cursor': legacy})
+        self.assertEqual((response.data['count'], len(response.data['data'])), (5, 4))
+
+
+class AsyncViewTests(StringsTestCase):
+    """The async views answer exactly like the DRF views."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for value in ['level', 'two words', 'Noon', 'hello world']:
+            self.client.post('/strings', {'value': value}, format='json')
+
+    def async_request(self, method, url, **kwargs):
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(getattr(self.async_client, method))(url, **kwargs)
+
+    def assertSameResponse(self, method, url, **kwargs):
+        cache.get_cache().clear()
+        expected = getattr(self.client, method)(url, **kwargs)
+        cache.get_cache().clear()
+        actual = self.async_request(method, url, **kwargs)
+        self.assertEqual(actual.status_code, expected.status_code, url)
+        self.assertEqual(actual.content, expected.content, url)
+        self.assertEqual(actual.get('X-Total-Count'), expected.get('X-Total-Count'), url)
+
+    def test_reads_match_the_sync_views(self):
+        for url in [
+            '/strings', '/strings?limit=2', '/strings?is_palindrome=true&fields=value,length',
+            '/strings?contains_character=z', '/strings?word_count=x', '/strings?count_only=true',
+            '/strings?exists=true&min_length=5', '/strings/level', '/strings/missing', '/strings/batch',
+            f'/strings/by-id/{hash_value("level")}',
+            '/strings/filter-by-natural-language?query=palindromic%20strings',
+            '/strings/filter-by-natural-language?query=gibberish',
+        ]:
+            self.assertSameResponse('get', url)
+        self.assertSameResponse('head', '/strings?word_count=2')
+
+    @override_settings(STRINGS_PAGE_SIZE=1)
+    def test_cursor_pages_and_streams(self):
+        response = self.async_request('get', '/strings')
+        page = self.async_request('get', json.loads(response.content)['next'])
+        self.assertEqual(page.content, self.client.get(response.json()['next']).content)
+        response = self.async_request('get', '/strings?stream=ndjson')
+        lines = async_to_sync(self.collect)(response)
+        self.assertEqual(len(lines.splitlines()), 4)
+
+    @staticmethod
+    async def collect(response):
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    def test_create_and_delete(self):
+        response = self.async_request('post', '/strings', data={'value': 'kayak'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.content, self.client.get('/strings/kayak').content)
+        response = self.async_request('post', '/strings', data={'value': 'kayak'}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        response = self.async_request('post', '/strings', data={'value': 5}, content_type='application/json')
+        self.assertEqual(response.status_code, 422)
+        response = self.async_request('post', '/strings', data={}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.async_request('delete', '/strings/kayak').status_code, 204)
+        self.assertEqual(self.async_request('delete', '/strings/kayak').status_code, 404)
+        self.assertFalse(AnalyzedString.objects.filter(value='kayak').exists())
+
+    @override_settings(STRINGS_ANALYSIS_OFFLOAD_THRESHOLD=0)
+    def test_create_offloads_analysis(self):
+        response = self.async_request('post', '/strings', data={'value': 'offloaded'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['properties']['length'], 9)
+
+
+@unittest.skipUnless(
+    connection.vendor == 'sqlite' and settings.SQLITE_PROFILE == 'tuned', 'tests the tuned SQLite profile'
+)
+class SQLiteProfileTests(unittest.TestCase):
+    """The tuned profile is applied to every new connection."""
+
+    def test_pragmas_and_transaction_mode(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertLess(cursor.fetchone()[0], 0)  # sized in KiB
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+
+
+class FrequencyMapContainmentTests(StringsTestCase):
+    """The JSONB key lookup used on PostgreSQL agrees with the character index."""
+
+    VALUES = ['Kelvin \u212a', 'kayak', 'İstanbul', 'istanbul', 'ΣΑΣ', 'plain']
+
+    def setUp(self):
+        super().setUp()
+        for value in self.VALUES:
+            AnalyzedString.objects.create(value=value)
+
+    def test_case_variants(self):
+        self.assertEqual(sorted(case_variants('k')), sorted(['K', '\u212a', 'k']))
+        self.assertEqual(case_variants('İ'), ['İ'])
+        self.assertEqual(sorted(case_variants('σ')), ['Σ', 'σ'])
+
+    def test_key_lookup_matches_character_index(self):
+        for char in ['k', 'K', '\u212a', 'i', 'İ', 'σ', 'z']:
+            by_index = AnalyzedString.objects.containing_character(char)
+            by_keys = AnalyzedString.objects.filter(character_frequency_map__has_any_keys=case_variants(char))
+            self.assertEqual(set(by_keys), set(by_index), char)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'requires PostgreSQL (DB_ENGINE=postgresql)')
+class PostgresFrequencyMapTests(StringsTestCase):
+    """The GIN index on character_frequency_map serves contains_character."""
+
+    def test_gin_index_serves_containment(self):
+        AnalyzedString.objects.create(value='hello world')
+        queryset = AnalyzedString.objects.containing_character('h')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn('strings_frequency_map_gin_idx', queryset.explain())
+        self.assertEqual(queryset.get().value, 'hello world')
+
+    def test_character_index_rows_are_not_written(self):
+        AnalyzedString.objects.create(value='hello world')
+        bulk_create_strings([AnalyzedString.from_value('two words')])
+        self.assertFalse(StringCharacter.objects.exists())
+        self.assertEqual(AnalyzedString.objects.containing_character('W').count(), 2)
+
+
+class ImportSQLiteTests(StringsTestCase):
+    """manage.py import_sqlite copies strings from an old SQLite database."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'old.sqlite3')
+        source = sqlite3.connect(self.path)
+        # The original schema: an integer key and a separate hash column
+        source.execute(
+            'CREATE TABLE analyzed_strings (id integer primary key, value text, '
+            'sha256_hash varchar(64), created_at datetime)'
+        )
+        source.executemany('INSERT INTO analyzed_strings (value, created_at) VALUES (?, ?)', [
+            ('level', '2025-01-02 03:04:05.123456'),
+            ('two words', '2025-01-03 00:00:00'),
+        ])
+        source.commit()
+        source.close()
+
+    def test_import_is_resumable(self):
+        AnalyzedString.objects.create(value='level')
+        call_command('import_sqlite', self.path, stdout=io.StringIO())
+        self.assertEqual(AnalyzedString.objects.count(), 2)
+        imported = AnalyzedString.objects.get(value='two words')
+        self.assertEqual(imported.created_at.isoformat(), '2025-01-03T00:00:00+00:00')
+        self.assertEqual(imported.word_count, 2)
+        self.assertTrue(AnalyzedString.objects.containing_character('W').exists())
+
+        call_command('import_sqlite', self.path, stdout=io.StringIO())
+        self.assertEqual(AnalyzedString.objects.count(), 2)
+        self.assertEqual(self.client.get('/strings/stats').json()['total'], 2)
+
+    def test_failed_timestamp_restore_keeps_nothing(self):
+        with unittest.mock.patch.object(
+            type(AnalyzedString.objects), 'bulk_update', side_effect=RuntimeError('interrupted')
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command('import_sqlite', self.path, stdout=io.StringIO())
+        self.assertFalse(AnalyzedString.objects.exists())
+        self.assertEqual(self.client.get('/strings/stats').json()['total'], 0)
+
+
+class ImportExportCommandTests(StringsTestCase):
+    """manage.py import_strings and export_strings."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def import_strings(self, *args):
+        stdout = io.StringIO()
+        call_command('import_strings', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_formats(self):
+        path = self.write('in.ndjson', '"level"\n{"value": "two words"}\nnot json\n"level"\n{"no": 1}\n')
+        self.assertIn('Imported 2 strings, skipped 1 already present and 2 invalid.', self.import_strings(path))
+        path = self.write('in.csv', 'id,value\n1,"comma, inside"\n2,"multi\nline"\n')
+        self.assertIn('Imported 2 strings', self.import_strings(path, '--batch-size', '1'))
+        path = self.write('in.txt.gz', 'noon\n\nkayak\r\n')
+        self.assertIn('Imported 2 strings', self.import_strings(path, '--backend', 'thread'))
+        self.assertEqual(sorted(AnalyzedString.objects.values_list('value', flat=True)),
+                         ['comma, inside', 'kayak', 'level', 'multi\nline', 'noon', 'two words'])
+        self.assertEqual(self.client.get('/strings/stats').json()['total'], 6)
+        with self.assertRaises(CommandError):
+            self.import_strings(self.write('in.csv', 'text\nx\n'))
+        with self.assertRaises(CommandError):
+            self.import_strings(self.write('in.dat', 'x\n'))
+
+    def test_resumes_from_the_checkpoint(self):
+        path = self.write('in.txt', 'a\nb\nc\nd\ne\n')
+        with open(f'{path}.checkpoint', 'w') as f:
+            f.write('{"records": 2}')
+        output = self.import_strings(path, '--batch-size', '2')
+        self.assertIn('Resuming after 2 records', output)
+        self.assertEqual(sorted(AnalyzedString.objects.values_list('value', flat=True)), ['c', 'd', 'e'])
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_checkpoint_follows_committed_batches(self):
+        path = self.write('in.txt', 'a\nb\nc\n')
+        batches = []
+
+        def fail_second_batch(batch, backend):
+            batches.append(batch)
+            if len(batches) == 2:
+                raise RuntimeError('interrupted')
+            return ingest_items(batch, backend)
+
+        with unittest.mock.patch('strings.management.commands.import_strings.ingest_items', fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.import_strings(path, '--batch-size', '2')
+        with open(f'{path}.checkpoint') as f:
+            self.assertEqual(json.load(f), {'records': 2})
+
+    def test_export_round_trip(self):
+        self.client.post('/strings/batch', ['level', 'two words', 'Ünïcode ✓'], format='json')
+        path = os.path.join(self.directory, 'out.ndjson.gz')
+        call_command('export_strings', path, '--chunk-size', '2', stdout=io.StringIO())
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, serialize_queryset(AnalyzedString.objects.order_by(*KEYSET_ORDERING)))
+
+        self.client.delete('/strings?all=true')
+        self.assertEqual(self.client.get('/strings').data['count'], 0)
+        self.import_strings(path)
+        # The import invalidated the cached list response
+        response = self.client.get('/strings')
+        self.assertEqual((response.data['count'], response['X-Cache']), (3, cache.MISS))
+
+    @override_settings(STRINGS_STREAM_CHUNK_SIZE=7)
+    def test_export_chunk_size_defaults_to_stream_setting(self):
+        path = os.path.join(self.directory, 'out.ndjson')
+        iterator = QuerySet.iterator
+        with unittest.mock.patch.object(QuerySet, 'iterator', autospec=True, side_effect=iterator) as mocked:
+            call_command('export_strings', path, '--no-compress', stdout=io.StringIO())
+        self.assertEqual(mocked.call_args.kwargs, {'chunk_size': 7})
+
+
+class ResponseCacheTests(StringsTestCase):
+    """Read-through caching of detail and filter responses."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.post('/strings', {'value': 'level'}, format='json')
+
+    def test_detail_is_cached_until_deleted(self):
+        self.assertEqual(self.client.get('/strings/level')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/strings/level')['X-Cache'], 'HIT')
+        self.client.delete('/strings/level')
+        self.assertEqual(self.client.get('/strings/level').status_code, 404)
+        self.assertEqual(cache.stats()['detail'], {'hits': 1, 'misses': 2})
+
+    def test_filter_responses_are_invalidated_by_writes(self):
+        first = self.client.get('/strings?is_palindrome=true&limit=10')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        # Parameter order does not change the cache key
+        second = self.client.get('/strings?limit=10&is_palindrome=true')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data['count'], 1)
+
+        self.client.post('/strings', {'value': 'noon'}, format='json')
+        third = self.client.get('/strings?is_palindrome=true&limit=10')
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual(third.data['count'], 2)
+
+        self.client.post('/strings/batch', ['kayak'], format='json')
+        self.assertEqual(self.client.get('/strings?is_palindrome=true&limit=10').data['count'], 3)
+        self.client.delete('/strings/noon')
+        self.assertEqual(self.client.get('/strings?is_palindrome=true&limit=10').data['count'], 2)
+
+    def test_natural_language_responses_are_cached(self):
+        url = '/strings/filter-by-natural-language?query=palindromic%20strings'
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.assertEqual(cache.stats()['filter'], {'hits': 1, 'misses': 1})
+
+
+class MetricsTests(StringsTestCase):
+    """Request metrics, /metrics and the Server-Timing header."""
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.client = APIClient()
+
+    def sample(self, text, name, labels):
+        prefix = f'{name}{labels} '
+        values = [line[len(prefix):] for line in text.splitlines() if line.startswith(prefix)]
+        self.assertEqual(len(values), 1, prefix)
+        return float(values[0])
+
+    def test_metrics_endpoint(self):
+        self.client.post('/strings', {'value': 'level'}, format='json')
+        self.client.get('/strings/level')
+        self.client.get('/strings/level')
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        self.assertIn('# TYPE strings_http_request_duration_seconds histogram', text)
+        labels = '{endpoint="string-detail",method="GET",status="200"}'
+        self.assertEqual(self.sample(text, 'strings_http_request_duration_seconds_count', labels), 2)
+        self.assertEqual(self.sample(
+            text, 'strings_http_request_duration_seconds_bucket',
+            '{endpoint="string-detail",method="GET",status="200",le="+Inf"}',
+        ), 2)
+        # The second detail lookup is served from the cache after an existence check
+        self.assertEqual(self.sample(
+            text, 'strings_db_queries_per_request_bucket', '{endpoint="string-detail",le="1"}'
+        ), 2)
+        self.assertGreater(self.sample(text, 'strings_db_queries_total', '{endpoint="string-list-create"}'), 0)
+        self.assertEqual(self.sample(text, 'strings_phase_duration_seconds_count', '{phase="analysis"}'), 1)
+        self.assertEqual(self.sample(text, 'strings_cache_requests_total', '{cache="detail",outcome="hit"}'), 1)
+        self.assertIn('strings_nl_query_cache_entries ', text)
+
+    def test_server_timing(self):
+        self.assertNotIn('Server-Timing', self.client.get('/strings'))
+        with override_settings(STRINGS_SERVER_TIMING=True):
+            timing = self.client.post('/strings', {'value': 'noon'}, format='json')['Server-Timing']
+        phases = [entry.split(';')[0] for entry in timing.split(', ')]
+        self.assertEqual(phases, ['db', 'analysis', 'serialization', 'total'])
+
+    def test_async_views_time_their_queries(self):
+        AnalyzedString.objects.create(value='level')
+        with override_settings(ROOT_URLCONF=__name__, STRINGS_SERVER_TIMING=True):
+            response = async_to_sync(self.async_client.get)('/strings?limit=5')
+        self.assertTrue(response['Server-Timing'].startswith('db;'))
+        text = self.client.get('/metrics').content.decode()
+        self.assertGreater(self.sample(text, 'strings_db_queries_total', '{endpoint="string-list-create"}'), 0)
+
+
+class ConditionalGetTests(StringsTestCase):
+    """ETags and If-None-Match on detail, list and natural-language responses."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.string = AnalyzedString.objects.create(value='level')
+
+    def test_detail_strong_etag(self):
+        response = self.client.get('/strings/level')
+        self.assertEqual(response['ETag'], f'"{self.string.id}"')
+        # The in-process cache entry is confirmed with one existence check
+        with self.assertNumQueries(1):
+            response = self.client.get('/strings/level', HTTP_IF_NONE_MATCH=f'"{self.string.id}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], f'"{self.string.id}"')
+        # Not cached: one existence check, no row fetched or serialized
+        cache.get_cache().clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/strings/by-id/{self.string.id}', HTTP_IF_NONE_MATCH=f'W/"x", "{self.string.id}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get('/strings/level', HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+        self.client.delete('/strings/level')
+        response = self.client.get('/strings/level', HTTP_IF_NONE_MATCH=f'"{self.string.id}"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_weak_etag_changes_with_writes(self):
+        for url in ['/strings?limit=5', '/strings/filter-by-natural-language?query=palindromes']:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertTrue(etag.startswith('W/"'))
+                # Only the write generation is read
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual((response.status_code, response['ETag']), (304, etag))
+                self.assertNotEqual(self.client.get(url + '&count_only=true')['ETag'], etag)
+                self.client.post('/strings', {'value': f'new {url}'}, format='json')
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_follows_deletes_this_process_did_not_see(self):
+        self.assertEqual(self.client.get('/strings/level').status_code, 200)
+        with unittest.mock.patch('strings.cache.invalidate'):
+            AnalyzedString.objects.filter(pk=self.string.id).delete()
+        response = self.client.get('/strings/level', HTTP_IF_NONE_MATCH=f'"{self.string.id}"')
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(cache.get_cache().get(cache.detail_key(self.string.id)))
+        cache.set_detail(self.string.id, {'value': 'level'})
+        with override_settings(ROOT_URLCONF=__name__):
+            self.assertEqual(async_to_sync(self.async_client.get)('/strings/level').status_code, 404)
+
+    def test_list_etag_follows_writes_this_process_did_not_see(self):
+        # A write by another worker never touches this process's cache
+        etag = self.client.get('/strings?limit=5')['ETag']
+        with unittest.mock.patch('strings.cache.invalidate'):
+            AnalyzedString.objects.create(value='written elsewhere')
+        response = self.client.get('/strings?limit=5', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Cache']), (200, cache.MISS))
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('written elsewhere', [row['value'] for row in response.data['data']])
+
+    def test_async_views(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            get = async_to_sync(self.async_client.get)
+            etag = get('/strings/level')['ETag']
+            self.assertEqual(get('/strings/level', headers={'If-None-Match': etag}).status_code, 304)
+            etag = get('/strings?limit=5')['ETag']
+            self.assertEqual(get('/strings?limit=5', headers={'If-None-Match': etag}).status_code, 304)
+
+
+class NaturalLanguageParserTests(unittest.TestCase):
+    """The compiled parser must agree with the original one on the query corpus."""
+
+    # Phrasings where the original parser was wrong, with the corrected parse
+    FIXED_PHRASINGS = {
+        'strings with 12 words': {'word_count': 12},
+        'strings that contains the letter q': {'contains_character': 'q'},
+        'single  word   palindromes': {'is_palindrome': True, 'word_count': 1},
+    }
+
+    def test_corpus_matches_reference_parser(self):
+        corpus = load_query_corpus()
+        self.assertGreaterEqual(len(corpus), 100)
+        for query in corpus:
+            with self.subTest(query=query):
+                expected = reference_parse_natural_language_query(query)
+                self.assertEqual(parse_query(query), expected)
+                self.assertEqual(list(parse_query(query)), list(expected))
+
+    def test_fixed_phrasings(self):
+        for query, expected in self.FIXED_PHRASINGS.items():
+            with self.subTest(query=query):
+                self.assertEqual(parse_query(query), expected)
+                self.assertNotEqual(reference_parse_natural_language_query(query), expected)
+
+    # Phrasings beyond the original grammar
+    RICHER_PHRASINGS = {
+        'strings that are not palindromes': {'is_palindrome': False},
+        'non-palindromic strings with 2 to 4 words': {
+            'is_palindrome': False, 'min_word_count': 2, 'max_word_count': 4,
+        },
+        'strings with at least 3 words': {'min_word_count': 3},
+        'strings with fewer than 3 words': {'max_word_count': 2},
+        'strings containing a and z': {'contains_characters': ['a', 'z']},
+        'strings containing the letters a, b and c': {'contains_characters': ['a', 'b', 'c']},
+        'strings containing a word': {},
+        'strings without the letter e': {'excludes_characters': ['e']},
+        'palindromes not containing x and y': {'is_palindrome': True, 'excludes_characters': ['x', 'y']},
+        'strings exactly 5 characters long': {'min_length': 5, 'max_length': 5},
+        'strings 7 characters long': {'min_length': 7, 'max_length': 7},
+        'strings between 3 and 8 characters': {'min_length': 3, 'max_length': 8},
+    }
+
+    def test_richer_phrasings(self):
+        for query, expected in self.RICHER_PHRASINGS.items():
+            with self.subTest(query=query):
+                self.assertEqual(parse_query(query), expected)
+
+    def test_results_are_memoized_per_normalized_query(self):
+        cache_clear()
+        parse_query('Palindromic strings')
+        parsed = parse_query('  palindromic   STRINGS ')
+        parsed['is_palindrome'] = False
+        self.assertEqual(parse_query('palindromic strings'), {'is_palindrome': True})
+        info = cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+    def test_cache_size_follows_setting(self):
+        with override_settings(STRINGS_NL_QUERY_CACHE_SIZE=2):
+            for query in ['palindromes', 'single word strings', 'strings longer than 3 characters']:
+                parse_query(query)
+            self.assertEqual((cache_info().maxsize, cache_info().currsize), (2, 2))
+        self.assertEqual(cache_info().maxsize, settings.STRINGS_NL_QUERY_CACHE_SIZE)
+
+
+class NaturalLanguageFilterTests(StringsTestCase):
+    """Richer natural-language filters, compiled into a single query."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for value in ['level', 'Amaze', 'zebra crossing', 'a quiet night out', 'hello']:
+            AnalyzedString.objects.create(value=value)
+
+    def matching(self, query):
+        response = self.client.get('/strings/filter-by-natural-language', {'query': query})
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row['value'] for row in response.data['data'])
+
+    def test_richer_filters(self):
+        self.assertEqual(self.matching('strings containing a and z'), ['Amaze', 'zebra crossing'])
+        self.assertEqual(self.matching('strings that are not palindromes without the letter z'),
+                         ['a quiet night out', 'hello'])
+        self.assertEqual(self.matching('strings with 2 to 4 words'), ['a quiet night out', 'zebra crossing'])
+        self.assertEqual(self.matching('strings exactly 5 characters long'), ['Amaze', 'hello', 'level'])
+
+    def test_filters_compile_into_one_query(self):
+        filters = parse_query('non-palindromic strings with at least 2 words containing a and z without the letter q')
+        queryset = filter_strings(filters)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([obj.value for obj in queryset], ['zebra crossing'])
+        self.assertEqual(len(queries), 1)
+
+    def test_absent_character_skips_the_strings_table(self):
+        # The write generation and the rollup; never the strings table
+        with self.assertNumQueries(2):
+            response = self.client.get('/strings/filter-by-natural-language?query=containing%20a%20and%20j')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_conflicting_filters(self):
+        for query in ['strings longer than 9 characters and at most 3 characters',
+                      'strings containing the letter e without the letter e',
+                      'single word strings with at least 2 words']:
+            with self.subTest(query=query):
+                response = self.client.get('/strings/filter-by-natural-language', {'query': query})
+                self.assertEqual(response.status_code, 422)
+                self.assertEqual(response.data, {'error': 'Query parsed but resulted in conflicting filters.'})
+
+
+class StatisticsTests(StringsTestCase):
+    """GET /strings/stats reads incrementally maintained summary rows."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def assert_matches_recount(self):
+        """The summary table must equal a full recount of the strings table."""
+        from .models import StringStatistic
+        rows = AnalyzedString.objects.values_list('length', 'is_palindrome', 'word_count')
+        expected = {key: count for key, count in StringStatistic.deltas(rows, 1).items() if count}
+        actual = {
+            (row.dimension, row.bucket): row.count
+            for row in StringStatistic.objects.exclude(count=0).exclude(dimension=StringStatistic.GENERATION)
+        }
+        self.assertEqual(actual, expected)
+
+    def assert_rollup_matches_recount(self):
+        from collections import Counter
+        from .models import CharacterRollup
+        totals, strings = Counter(), Counter()
+        for value in AnalyzedString.objects.values_list('value', flat=True):
+            folded = Counter(value.lower())
+            totals.update(folded)
+            strings.update(folded.keys())
+        actual = {
+            row.character: (row.total_count, row.string_count)
+            for row in CharacterRollup.objects.exclude(string_count=0)
+        }
+        self.assertEqual(actual, {char: (totals[char], strings[char]) for char in totals})
+
+    def test_stats_follow_creates_and_deletes(self):
+        self.client.post('/strings', {'value': 'level'}, format='json')
+        self.client.post('/strings/batch', ['hello world', 'noon', 'a' * 40], format='json')
+        self.client.post('/strings/upload', 'three word value', content_type='text/plain')
+        self.assert_matches_recount()
+        self.assert_rollup_matches_recount()
+
+        stats = self.client.get('/strings/stats?top=2').data
+        self.assertEqual(stats['total'], 5)
+        self.assertEqual(stats['palindromes'], {'true': 3, 'false': 2})
+        self.assertIn({'min': 32, 'max': 63, 'count': 1}, stats['length'])
+        self.assertIn({'min': 3, 'max': 3, 'count': 1}, stats['word_count'])
+        self.assertEqual(stats['top_characters'][0], {'character': 'a', 'total_count': 41, 'string_count': 2})
+        self.assertEqual(len(stats['top_characters']), 2)
+
+        self.client.delete('/strings/noon')
+        AnalyzedString.objects.filter(is_palindrome=False).delete()
+        self.assert_matches_recount()
+        self.assert_rollup_matches_recount()
+        self.assertEqual(self.client.get('/strings/stats').data['total'], 2)
+
+    def test_repeated_bulk_create_counts_each_string_once(self):
+        self.assertEqual(len(bulk_create_strings([AnalyzedString.from_value('dup')])), 1)
+        self.assertEqual(bulk_create_strings([AnalyzedString.from_value('dup')]), [])
+        self.assertEqual(AnalyzedString.objects.count(), 1)
+        self.assert_matches_recount()
+        self.assert_rollup_matches_recount()
+
+    def test_string_inserted_concurrently_is_reported_as_a_conflict(self):
+        # Another writer commits 'racecar' after the existence check ran
+        real_existing_ids = existing_ids
+
+        def stale_lookup(ids):
+            lookup.side_effect = real_existing_ids
+            AnalyzedString.objects.create(value='racecar')
+            return set()
+
+        with unittest.mock.patch('strings.ingest.existing_ids', side_effect=stale_lookup) as lookup:
+            results = ingest_items(['racecar', 'kayak'])
+        self.assertEqual([result['status'] for result in results], ['conflict', 'created'])
+        self.assert_matches_recount()
+        self.assert_rollup_matches_recount()
+
+    def test_invalid_top(self):
+        self.assertEqual(self.client.get('/strings/stats?top=abc').status_code, 400)
+        self.assertEqual(self.client.get('/strings/stats?top=1000').status_code, 400)
+
+
+class CharacterRollupTests(StringsTestCase):
+    """GET /strings/stats/characters and the zero-count contains_character shortcut."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.post('/strings/batch', ['Banana', 'apple', 'kiwi'], format='json')
+
+    def test_top_characters_by_total_and_by_strings(self):
+        by_total = self.client.get('/strings/stats/characters?top=2').data['characters']
+        self.assertEqual(by_total, [
+            {'character': 'a', 'total_count': 4, 'string_count': 2},
+            {'character': 'i', 'total_count': 2, 'string_count': 1},
+        ])
+        by_strings = self.client.get('/strings/stats/characters?top=1&order=strings').data['characters']
+        self.assertEqual(by_strings[0]['character'], 'a')
+
+    def test_single_character_counts(self):
+        self.assertEqual(self.client.get('/strings/stats/characters?character=B').data,
+                         {'character': 'b', 'total_count': 1, 'string_count': 1})
+        self.assertEqual(self.client.get('/strings/stats/characters?character=z').data['string_count'], 0)
+        self.assertEqual(self.client.get('/strings/stats/characters?character=ab').status_code, 400)
+
+    def test_absent_character_skips_the_strings_table(self):
+        # The write generation and the rollup; never the strings table
+        with self.assertNumQueries(2):
+            response = self.client.get('/strings?contains_character=z')
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(self.client.get('/strings?contains_character=k').data['count'], 1)
+
+    def test_rollup_queries_do_not_grow_with_distinct_characters(self):
+        def create_queries(value):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.post('/strings', {'value': value}, format='json').status_code, 201)
+            return len(queries)
+
+        short = create_queries('ab')
+        self.assertEqual(create_queries(''.join(chr(0x4E00 + i) for i in range(300))), short)
+        # Beyond one batch, one more upsert per batch rather than one per character
+        cjk = ''.join(chr(0x5000 + i) for i in range(3000))
+        self.assertLess(create_queries(cjk), short + 30)
+        self.assertEqual(self.client.get('/strings/stats/characters?character=' + cjk[-1]).data['string_count'], 1)
+        self.client.delete('/strings/' + cjk)
+        self.assertEqual(self.client.get('/strings/stats/characters?character=' + cjk[-1]).data['string_count'], 0)
@@ -1,8 +1,13 @@
-from django.urls import path
-from .views import StringListCreateView, StringDetailView, NaturalLanguageFilterView
+from django.urls import path, re_path
+from .views import StringListCreateView, StringBatchView, StringUploadView, StringStatsView, CharacterStatsView, StringDetailView, StringByIdView, NaturalLanguageFilterView
 
 urlpatterns = [
     path('', StringListCreateView.as_view(), name='string-list-create'),
+    path('/batch', StringBatchView.as_view(), name='string-batch'),
+    path('/upload', StringUploadView.as_view(), name='string-upload'),
+    path('/stats', StringStatsView.as_view(), name='string-stats'),
+    path('/stats/characters', CharacterStatsView.as_view(), name='string-character-stats'),
     path('/filter-by-natural-language', NaturalLanguageFilterView.as_view(), name='string-natural-language-filter'),
+    re_path(r'^/by-id/(?P<string_id>[0-9a-fA-F]{64})$', StringByIdView.as_view(), name='string-by-id'),
     path('/<path:string_value>', StringDetailView.as_view(), name='string-detail'),
 ]
@@ -1,102 +1,142 @@
 from rest_framework import status
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db import IntegrityError
-from django.db.models import Q
-from .models import AnalyzedString
-from .serializers import AnalyzedStringSerializer, CreateStringSerializer
-import re
+from django.conf import settings
+from django.http import HttpResponse
+from . import cache, metrics
+from .analysis import hash_value
+from .ingest import CONFLICT, CREATED, INVALID, ingest_items
+from .filters import (
+    ConflictingFilters, InvalidFilter, check_conflicts, filter_strings, parse_delete_filters, parse_list_filters,
+)
+from .models import AnalyzedString, CharacterRollup, StringStatistic, fold_character
+from .nlquery import parse_query
+from .pagination import InvalidPageParameter, paginate_queryset, parse_flag, stream_queryset
+from .parsers import NDJSONParser
+from .serializers import CreateStringSerializer, InvalidProjection, Projection, represent_instance, serialize_queryset
+from .streaming import BodyTooLarge, analyze_stream, read_text
+import io
+import tempfile
+
+
+def query_result(queryset, request, projection):
+    """
+    Return the data, count and next link of a filter response, or only the
+    existence (``?exists=true``) or count (``?count_only=true`` and HEAD)
+    of the matching strings without reading any rows.
+    """
+    if parse_flag(request.query_params, 'exists'):
+        return {'exists': queryset.exists()}
+    if request.method == 'HEAD' or parse_flag(request.query_params, 'count_only'):
+        return {'count': queryset.count()}
+    rows, count, next_url = paginate_queryset(queryset, request, projection)
+    return {'data': rows, 'count': count, 'next': next_url}
+
+
+def filter_response(data, cache_outcome, etag):
+    """Respond with a list/filter payload, exposing its count as X-Total-Count."""
+    headers = {'X-Cache': cache_outcome, 'ETag': etag}
+    if 'count' in data:
+        headers['X-Total-Count'] = str(data['count'])
+    return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+
+def purge_strings(filters):
+    """
+    Delete every string matching ``filters`` in bounded batches, invalidating
+    the cached responses of each batch, and return the number removed.
+    """
+    deleted = 0
+    batches = filter_strings(filters).delete_in_batches(settings.STRINGS_DELETE_BATCH_SIZE)
+    for string_ids, count in batches:
+        cache.invalidate(string_ids)
+        deleted += count
+    return deleted
+
+
+def parse_purge_request(query_params):
+    """
+    Validate the filters of DELETE /strings. Deleting everything must be
+    asked for explicitly with ``?all=true``.
+    """
+    filters = parse_delete_filters(query_params)
+    if not filters and not parse_flag(query_params, 'all'):
+        raise InvalidFilter("Provide at least one filter, or all=true to delete every string.")
+    return filters
 
 
 class StringListCreateView(APIView):
     """
-    GET /strings - List all strings with optional filtering
+    GET /strings - List strings with optional filtering (keyset-paginated or streamed)
+    HEAD /strings - Count strings matching the filters
     POST /strings - Create/Analyze a new string
+    DELETE /strings - Delete every string matching the filters
     """
     
     def get(self, request):
         """Get all strings with optional filtering."""
         try:
-            queryset = AnalyzedString.objects.all()
-            filters_applied = {}
+            stream = request.query_params.get('stream')
+            if stream is None:
+                cache_key = cache.filter_key(request)
+                etag = cache.filter_etag(cache_key)
+                if cache.etag_matches(request, etag):
+                    return not_modified(etag)
+                cached = cache.get_filtered(cache_key)
+                if cached is not None:
+                    return filter_response(cached, cache.HIT, etag)
             
-            # Apply filters based on query parameters
-            is_palindrome = request.query_params.get('is_palindrome')
-            min_length = request.query_params.get('min_length')
-            max_length = request.query_params.get('max_length')
-            word_count = request.query_params.get('word_count')
-            contains_character = request.query_params.get('contains_character')
+            filters_applied = parse_list_filters(request.query_params)
+            queryset = filter_strings(filters_applied)
             
-            if is_palindrome is not None:
-                # Convert to boolean
-                if is_palindrome.lower() == 'true':
-                    queryset = queryset.filter(is_palindrome=True)
-                    filters_applied['is_palindrome'] = True
-                elif is_palindrome.lower() == 'false':
-                    queryset = queryset.filter(is_palindrome=False)
-                    filters_applied['is_palindrome'] = False
-                else:
-                    return Response(
-                        {"error": "Invalid value for is_palindrome. Use 'true' or 'false'."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+            projection = Projection.from_query_params(request.query_params)
             
-            if min_length is not None:
-                try:
-                    min_length = int(min_length)
-                    queryset = queryset.filter(length__gte=min_length)
-                    filters_applied['min_length'] = min_length
-                except ValueError:
-                    return Response(
-                        {"error": "Invalid value for min_length. Must be an integer."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            if max_length is not None:
-                try:
-                    max_length = int(max_length)
-                    queryset = queryset.filter(length__lte=max_length)
-                    filters_applied['max_length'] = max_length
-                except ValueError:
-                    return Response(
-                        {"error": "Invalid value for max_length. Must be an integer."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            if word_count is not None:
-                try:
-                    word_count = int(word_count)
-                    queryset = queryset.filter(word_count=word_count)
-                    filters_applied['word_count'] = word_count
-                except ValueError:
-                    return Response(
-                        {"error": "Invalid value for word_count. Must be an integer."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            if contains_character is not None:
-                if len(contains_character) != 1:
-                    return Response(
-                        {"error": "contains_character must be a single character."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                queryset = queryset.filter(value__icontains=contains_character)
-                filters_applied['contains_character'] = contains_character
+            if stream is not None:
+                return stream_queryset(queryset, stream, projection)
             
-            serializer = AnalyzedStringSerializer(queryset, many=True)
-            
-            return Response({
-                'data': serializer.data,
-                'count': queryset.count(),
+            data = {
+                **query_result(queryset, request, projection),
                 'filters_applied': filters_applied
-            }, status=status.HTTP_200_OK)
+            }
+            cache.set_filtered(cache_key, data)
+            return filter_response(data, cache.MISS, etag)
         
+        except (InvalidFilter, InvalidPageParameter, InvalidProjection) as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    def head(self, request):
+        """Count the matching strings; the count is sent as X-Total-Count."""
+        return self.get(request)
+    
+    def delete(self, request):
+        """Delete the strings matching the filters, in bounded batches."""
+        try:
+            filters_applied = parse_purge_request(request.query_params)
+        except (InvalidFilter, InvalidPageParameter) as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'deleted': purge_strings(filters_applied),
+            'filters_applied': filters_applied
+        }, status=status.HTTP_200_OK)
+    
     def post(self, request):
         """Create and analyze a new string."""
         # Validate request body
@@ -123,10 +163,9 @@ class StringListCreateView(APIView):
         try:
             # Create the analyzed string
             analyzed_string = serializer.save()
-            response_serializer = AnalyzedStringSerializer(analyzed_string)
             
             return Response(
-                response_serializer.data,
+                represent_instance(analyzed_string),
                 status=status.HTTP_201_CREATED
             )
         
@@ -148,98 +187,266 @@ class StringDetailView(APIView):
     DELETE /strings/{string_value} - Delete a specific string
     """
     
-    def get(self, request, string_value):
-        """Get a specific string by its value."""
-        try:
-            analyzed_string = AnalyzedString.objects.get(value=string_value)
-            serializer = AnalyzedStringSerializer(analyzed_string)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except AnalyzedString.DoesNotExist:
+    def get_string_id(self):
+        """Return the primary key addressed by the URL: the SHA-256 of the value."""
+        return hash_value(self.kwargs['string_value'])
+    
+    def get(self, request, **kwargs):
+        """Get a specific string by its primary key."""
+        string_id = self.get_string_id()
+        etag = cache.detail_etag(string_id)
+        cached = cache.get_detail(string_id)
+        if cached is not None and cache.is_per_process() and not (
+            AnalyzedString.objects.filter(pk=string_id).exists()
+        ):
+            # Deleted by another worker, whose invalidation never reached this process
+            cache.invalidate([string_id])
+            cached = None
+        # A string never changes, so a matching ETag only needs it to still exist
+        if cache.etag_matches(request, etag) and (
+            cached is not None or AnalyzedString.objects.filter(pk=string_id).exists()
+        ):
+            return not_modified(etag)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK, headers={'X-Cache': cache.HIT, 'ETag': etag})
+        
+        rows = serialize_queryset(AnalyzedString.objects.filter(pk=string_id))
+        if not rows:
             return Response(
                 {"error": "String does not exist in the system."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        cache.set_detail(string_id, rows[0])
+        return Response(rows[0], status=status.HTTP_200_OK, headers={'X-Cache': cache.MISS, 'ETag': etag})
     
-    def delete(self, request, string_value):
-        """Delete a specific string by its value."""
-        try:
-            analyzed_string = AnalyzedString.objects.get(value=string_value)
-            analyzed_string.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except AnalyzedString.DoesNotExist:
+    def delete(self, request, **kwargs):
+        """Delete a specific string by its primary key."""
+        string_id = self.get_string_id()
+        deleted, _ = AnalyzedString.objects.filter(pk=string_id).delete()
+        if not deleted:
             return Response(
                 {"error": "String does not exist in the system."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        cache.invalidate([string_id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class NaturalLanguageFilterView(APIView):
+class StringByIdView(StringDetailView):
     """
-    GET /strings/filter-by-natural-language - Filter strings using natural language query
+    GET /strings/by-id/{sha256} - Get a specific string by its ID
+    DELETE /strings/by-id/{sha256} - Delete a specific string by its ID
     """
     
-    def parse_natural_language_query(self, query):
-        """Parse natural language query into filter parameters."""
-        query_lower = query.lower().strip()
-        filters = {}
+    def get_string_id(self):
+        return self.kwargs['string_id'].lower()
+
+
+class NamedStringMixin:
+    """
+    Answer GET and DELETE on a POST endpoint whose path is also a string
+    value, e.g. /strings/batch, as the detail route for ``string_value``.
+    """
+    
+    string_value = None
+    
+    def get(self, request):
+        """Get the string named like this endpoint."""
+        return StringDetailView.as_view()(request._request, string_value=self.string_value)
+    
+    def delete(self, request):
+        """Delete the string named like this endpoint."""
+        return StringDetailView.as_view()(request._request, string_value=self.string_value)
+
+
+class StringBatchView(NamedStringMixin, APIView):
+    """
+    POST /strings/batch - Analyze many strings in one request
+    GET, DELETE /strings/batch - The string "batch", like any other value
+    """
+    
+    string_value = 'batch'
+    
+    parser_classes = [JSONParser, NDJSONParser]
+    
+    def post(self, request):
+        """Create and analyze a batch of strings, reporting a status per item."""
+        items = request.data
+        if isinstance(items, dict) and 'values' in items:
+            items = items['values']
         
-        # Check for palindrome
-        if 'palindrome' in query_lower or 'palindromic' in query_lower:
-            filters['is_palindrome'] = True
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Request body must be a JSON array, an object with a 'values' array, or NDJSON."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Check for word count
-        if 'single word' in query_lower or 'one word' in query_lower:
-            filters['word_count'] = 1
-        elif 'two word' in query_lower or '2 word' in query_lower:
-            filters['word_count'] = 2
-        elif 'three word' in query_lower or '3 word' in query_lower:
-            filters['word_count'] = 3
-        else:
-            # Try to extract number followed by "word" or "words"
-            word_count_match = re.search(r'(\d+)\s*words?', query_lower)
-            if word_count_match:
-                filters['word_count'] = int(word_count_match.group(1))
+        if len(items) > settings.STRINGS_BATCH_MAX_ITEMS:
+            return Response(
+                {"error": f"A batch may contain at most {settings.STRINGS_BATCH_MAX_ITEMS} items."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Check for length constraints
-        # "longer than X characters" or "more than X characters"
-        longer_match = re.search(r'(?:longer|more)\s+than\s+(\d+)\s*(?:character|char)', query_lower)
-        if longer_match:
-            filters['min_length'] = int(longer_match.group(1)) + 1
+        results = ingest_items(items)
+        summary = {CREATED: 0, CONFLICT: 0, INVALID: 0}
+        for result in results:
+            summary[result['status']] += 1
+        
+        return Response({
+            'results': results,
+            'created': summary[CREATED],
+            'conflicts': summary[CONFLICT],
+            'invalid': summary[INVALID]
+        }, status=status.HTTP_200_OK)
+
+
+class StringUploadView(NamedStringMixin, APIView):
+    """
+    POST /strings/upload - Analyze a large string streamed as the request body
+    GET, DELETE /strings/upload - The string "upload", like any other value
+    
+    The string is sent as a raw ``text/plain`` body or as the ``file`` part of
+    a multipart upload, and is analyzed in chunks instead of being decoded
+    into memory several times over.
+    """
+    
+    string_value = 'upload'
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        """Create and analyze a string from a streamed upload."""
+        chunk_size = settings.STRINGS_UPLOAD_CHUNK_SIZE
+        max_bytes = settings.STRINGS_UPLOAD_MAX_BYTES
         
-        # "shorter than X characters" or "less than X characters"
-        shorter_match = re.search(r'(?:shorter|less)\s+than\s+(\d+)\s*(?:character|char)', query_lower)
-        if shorter_match:
-            filters['max_length'] = int(shorter_match.group(1)) - 1
+        with tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE) as spool:
+            try:
+                if request.content_type.startswith('multipart/'):
+                    if 'file' not in request.FILES:
+                        return Response(
+                            {"error": "Missing 'file' part in multipart body."},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    properties, source = analyze_stream(request.FILES['file'], chunk_size, max_bytes)
+                elif request.content_type.startswith('text/plain'):
+                    body = request.stream or io.BytesIO()
+                    properties, source = analyze_stream(body, chunk_size, max_bytes, spool)
+                else:
+                    return Response(
+                        {"error": "Upload must be a text/plain or multipart/form-data body."},
+                        status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+                    )
+            except BodyTooLarge as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            except UnicodeDecodeError:
+                return Response(
+                    {"error": "Upload must be valid UTF-8 text."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            if AnalyzedString.objects.filter(pk=properties['id']).exists():
+                return Response(
+                    {"error": "String already exists in the system."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            analyzed_string = AnalyzedString.from_value(read_text(source, chunk_size), properties)
         
-        # "at least X characters"
-        at_least_match = re.search(r'at\s+least\s+(\d+)\s*(?:character|char)', query_lower)
-        if at_least_match:
-            filters['min_length'] = int(at_least_match.group(1))
+        try:
+            analyzed_string.save(force_insert=True)
+        except IntegrityError:
+            return Response(
+                {"error": "String already exists in the system."},
+                status=status.HTTP_409_CONFLICT
+            )
         
-        # "at most X characters"
-        at_most_match = re.search(r'at\s+most\s+(\d+)\s*(?:character|char)', query_lower)
-        if at_most_match:
-            filters['max_length'] = int(at_most_match.group(1))
+        return Response(
+            represent_instance(analyzed_string),
+            status=status.HTTP_201_CREATED
+        )
+
+
+class StringStatsView(APIView):
+    """
+    GET /strings/stats - Aggregate statistics over all stored strings
+    """
+    
+    def get(self, request):
+        """Return counts and histograms from the maintained summary table."""
+        top = request.query_params.get('top', '10')
+        try:
+            top = int(top)
+        except ValueError:
+            top = -1
+        if top < 0 or top > settings.STRINGS_STATS_MAX_TOP_CHARACTERS:
+            return Response(
+                {"error": f"Invalid value for top. Must be an integer between 0 and {settings.STRINGS_STATS_MAX_TOP_CHARACTERS}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Check for specific character containment
-        # "containing the letter X" or "with the letter X"
-        letter_match = re.search(r'(?:containing|with|contain)\s+(?:the\s+)?(?:letter|character)\s+([a-z])', query_lower)
-        if letter_match:
-            filters['contains_character'] = letter_match.group(1)
+        return Response(StringStatistic.report(top), status=status.HTTP_200_OK)
+
+
+class CharacterStatsView(APIView):
+    """
+    GET /strings/stats/characters - Corpus-wide character counts
+    """
+    
+    ORDERINGS = {'total': 'total_count', 'strings': 'string_count'}
+    
+    def get(self, request):
+        """Return the top-N characters, or the counts for a single character."""
+        character = request.query_params.get('character')
+        if character is not None:
+            if len(character) != 1:
+                return Response(
+                    {"error": "character must be a single character."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            row = CharacterRollup.objects.filter(character=fold_character(character)).first()
+            return Response({
+                'character': fold_character(character),
+                'total_count': row.total_count if row else 0,
+                'string_count': row.string_count if row else 0
+            }, status=status.HTTP_200_OK)
         
-        # Check for vowel references
-        if 'first vowel' in query_lower:
-            filters['contains_character'] = 'a'
-        elif 'second vowel' in query_lower:
-            filters['contains_character'] = 'e'
-        elif 'third vowel' in query_lower:
-            filters['contains_character'] = 'i'
-        elif 'fourth vowel' in query_lower:
-            filters['contains_character'] = 'o'
-        elif 'fifth vowel' in query_lower:
-            filters['contains_character'] = 'u'
+        order = request.query_params.get('order', 'total')
+        if order not in self.ORDERINGS:
+            return Response(
+                {"error": "Invalid value for order. Use 'total' or 'strings'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            top = int(request.query_params.get('top', '10'))
+        except ValueError:
+            top = -1
+        if top < 0 or top > settings.STRINGS_STATS_MAX_TOP_CHARACTERS:
+            return Response(
+                {"error": f"Invalid value for top. Must be an integer between 0 and {settings.STRINGS_STATS_MAX_TOP_CHARACTERS}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return filters
+        return Response({
+            'characters': CharacterRollup.top(top, self.ORDERINGS[order]),
+            'order': order
+        }, status=status.HTTP_200_OK)
+
+
+class NaturalLanguageFilterView(APIView):
+    """
+    GET /strings/filter-by-natural-language - Filter strings using natural language query
+    HEAD /strings/filter-by-natural-language - Count strings matching the query
+    """
+    
+    def parse_natural_language_query(self, query):
+        """Parse natural language query into filter parameters."""
+        return parse_query(query)
+    
+    def head(self, request):
+        """Count the matching strings; the count is sent as X-Total-Count."""
+        return self.get(request)
     
     def get(self, request):
         """Filter strings using natural language query."""
@@ -251,6 +458,14 @@ class NaturalLanguageFilterView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        cache_key = cache.filter_key(request)
+        etag = cache.filter_etag(cache_key)
+        if cache.etag_matches(request, etag):
+            return not_modified(etag)
+        cached = cache.get_filtered(cache_key)
+        if cached is not None:
+            return filter_response(cached, cache.HIT, etag)
+        
         try:
             # Parse the natural language query
             parsed_filters = self.parse_natural_language_query(query)
@@ -261,38 +476,39 @@ class NaturalLanguageFilterView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Apply filters to queryset
-            queryset = AnalyzedString.objects.all()
-            
-            if 'is_palindrome' in parsed_filters:
-                queryset = queryset.filter(is_palindrome=parsed_filters['is_palindrome'])
-            
-            if 'min_length' in parsed_filters:
-                queryset = queryset.filter(length__gte=parsed_filters['min_length'])
-            
-            if 'max_length' in parsed_filters:
-                queryset = queryset.filter(length__lte=parsed_filters['max_length'])
-            
-            if 'word_count' in parsed_filters:
-                queryset = queryset.filter(word_count=parsed_filters['word_count'])
-            
-            if 'contains_character' in parsed_filters:
-                queryset = queryset.filter(value__icontains=parsed_filters['contains_character'])
+            try:
+                check_conflicts(parsed_filters)
+            except ConflictingFilters:
+                return Response(
+                    {"error": "Query parsed but resulted in conflicting filters."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
             
-            serializer = AnalyzedStringSerializer(queryset, many=True)
+            queryset = filter_strings(parsed_filters)
             
-            return Response({
-                'data': serializer.data,
-                'count': queryset.count(),
+            projection = Projection.from_query_params(request.query_params)
+            data = {
+                **query_result(queryset, request, projection),
                 'interpreted_query': {
                     'original': query,
                     'parsed_filters': parsed_filters
                 }
-            }, status=status.HTTP_200_OK)
+            }
+            cache.set_filtered(cache_key, data)
+            return filter_response(data, cache.MISS, etag)
         
+        except (InvalidPageParameter, InvalidProjection) as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+
+def metrics_view(request):
+    """GET /metrics - Request, query and cache metrics in Prometheus text format"""
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)